@@ -0,0 +1,276 @@
+"""Venvy benchmark suite.
+
+Builds synthetic trees (see synth.SIZES) and times discovery, environment
+detection, interpreter probing, GUI scans and venv creation. Everything runs
+with HOME and the cache/config directories pointed at a temporary folder, so
+your own index and caches are not touched.
+
+Results are printed as a table or written as JSON with --output. Pass
+--baseline to compare against a stored results file: the run fails (exit
+status 1) if any benchmark's median got slower than the baseline by more
+than --tolerance.
+"""
+import os
+import sys
+import json
+import time
+import shutil
+import fnmatch
+import argparse
+import platform
+import statistics
+import tempfile
+import contextlib
+from io import StringIO
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+import synth
+
+# Benchmarks whose median moves less than this many seconds are never a regression
+MIN_DELTA = 0.005
+
+def isolate(home):
+    """Point HOME, caches and config at home; called before Venvy modules are used."""
+    for name in ('HOME', 'USERPROFILE', 'APPDATA', 'LOCALAPPDATA'):
+        os.environ[name] = str(home)
+    os.environ['XDG_CACHE_HOME'] = str(home / '.cache')
+    os.environ['XDG_CONFIG_HOME'] = str(home / '.config')
+    # The current folder and active environments become search roots too
+    for name in ('VIRTUAL_ENV', 'WORKON_HOME', 'VIRTUALENVWRAPPER_HOOK_DIR'):
+        os.environ.pop(name, None)
+    home.mkdir(parents=True, exist_ok=True)
+    os.chdir(home)
+
+def timed(fn, repeat, setup=None):
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return times
+
+class Suite:
+    def __init__(self, work, repeat, only=None):
+        self.work = work
+        self.repeat = repeat
+        self.only = only
+        self.results = []
+
+    def wanted(self, name):
+        return not self.only or any(fnmatch.fnmatch(name, pattern) for pattern in self.only)
+
+    def run(self, name, size, fn, setup=None, repeat=None):
+        if not self.wanted(name):
+            return
+        times = timed(fn, repeat or self.repeat, setup)
+        result = {'name': name, 'size': size, 'median': round(statistics.median(times), 6),
+                  'min': round(min(times), 6), 'runs': len(times)}
+        self.results.append(result)
+        print(f"{name + '[' + size + ']':<36} {result['median'] * 1000:10.1f} ms", file=sys.stderr)
+
+def bench_discovery(suite, size, tree, venvs, dirs):
+    import venvty
+    from venvindex import VenvIndex
+    index_file = suite.work / f'index-{size}.json'
+
+    def fresh_index():
+        if index_file.exists():
+            index_file.unlink()
+
+    def find(rescan):
+        found = venvty.find_venvs(tree, rescan=rescan, index=VenvIndex(index_file))
+        assert len(found) == len(venvs), f"found {len(found)} of {len(venvs)} venvs"
+
+    suite.run('discovery.cold', size, lambda: find(True), setup=fresh_index)
+    find(False)
+    suite.run('discovery.warm', size, lambda: find(False))
+    probes = venvs + dirs[:len(venvs)]
+    suite.run('is_venv', size, lambda: [venvty.is_venv(p) for p in probes])
+
+def bench_probe(suite, pythons):
+    import interpreters
+    cache_file = suite.work / 'interpreters-bench.json'
+
+    def fresh_cache():
+        if cache_file.exists():
+            cache_file.unlink()
+
+    def probe():
+        cache = interpreters.InterpreterCache(cache_file)
+        found = list(interpreters.probe_all(pythons, cache=cache))
+        cache.save()
+        assert all(info for _, info in found), "a fake interpreter failed to answer"
+
+    size = str(len(pythons))
+    suite.run('probe.cold', size, probe, setup=fresh_cache)
+    suite.run('probe.warm', size, probe)
+
+def bench_create(suite):
+    import venvty
+    target = suite.work / 'created'
+
+    def clean():
+        shutil.rmtree(target, ignore_errors=True)
+
+    def create(use_template):
+        with contextlib.redirect_stdout(StringIO()):
+            venvty.create_venv(target, sys.executable, with_pip=False, use_template=use_template)
+
+    if not suite.wanted('create.*'):
+        return
+    clean()
+    create(True)  # Builds the template once, outside the timings
+    suite.run('create.template', '-', lambda: create(True), setup=clean)
+    suite.run('create.venv', '-', lambda: create(False), setup=clean)
+    clean()
+
+class Gui:
+    """A VenvManager window driven from the benchmarks; raises ImportError without PyQt6."""
+
+    def __init__(self):
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+        from PyQt6.QtWidgets import QApplication
+        self.app = QApplication.instance() or QApplication([])
+        import venvy
+        self.venvy = venvy
+        self.window = None
+
+    def open(self, roots):
+        import venvroots
+        venvroots.save_roots(roots)
+        if self.window is not None:
+            self.window.close()
+        self.window = self.venvy.VenvManager()
+        self.app.processEvents()  # Starts the scan the window queues for itself
+        self.wait()
+
+    def wait(self):
+        """Run the event loop until the window's scan has finished."""
+        from PyQt6.QtCore import QEventLoop
+        while self.window.scan_worker is not None:
+            self.app.processEvents(QEventLoop.ProcessEventsFlag.WaitForMoreEvents)
+        self.window.cancel_sizing()
+
+    def load_venvs(self):
+        self.window.load_venvs()
+        self.wait()
+
+    def close(self):
+        if self.window is not None:
+            self.window.close()
+            self.window = None
+
+def bench_gui(suite, gui, size, tree, venvs):
+    import venvroots
+    gui.open([venvroots.make_root(tree, depth=None)])
+    window = gui.window
+
+    def forget():
+        with window.index._lock:
+            window.index.dirs.clear()
+            window.index.venvs.clear()
+
+    suite.run('gui.load_venvs.cold', size, gui.load_venvs, setup=forget)
+    suite.run('gui.load_venvs.warm', size, gui.load_venvs)
+    assert len(window.venv_model.rows) == len(venvs), "GUI scan missed venvs"
+
+def bench_gui_pythons(suite, gui, pythons):
+    import interpreters
+    window = gui.window
+    window.find_python_candidates = lambda: pythons
+    size = str(len(pythons))
+    suite.run('gui.find_python_versions.cold', size, window.find_python_versions,
+              setup=interpreters.default_cache().entries.clear)
+    suite.run('gui.find_python_versions.warm', size, window.find_python_versions)
+
+def compare(results, baseline, tolerance):
+    """Results slower than their baseline median by more than tolerance (a fraction)."""
+    base = {(r['name'], r['size']): r for r in baseline.get('results', [])}
+    regressions = []
+    for result in results:
+        old = base.get((result['name'], result['size']))
+        if old is None:
+            continue
+        limit = old['median'] * (1 + tolerance)
+        if result['median'] > limit and result['median'] - old['median'] > MIN_DELTA:
+            regressions.append({**result, 'baseline': old['median']})
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='small,medium', help=f"Comma-separated tree sizes out of {', '.join(synth.SIZES)} (default: small,medium)")
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the median is reported (default: 3)')
+    parser.add_argument('--only', action='append', metavar='GLOB', help='Only run benchmarks whose name matches (repeatable)')
+    parser.add_argument('--pythons', type=int, default=16, help='Number of fake interpreters to probe (default: 16)')
+    parser.add_argument('--python-delay', type=float, default=0.1, help='Seconds each fake interpreter sleeps (default: 0.1)')
+    parser.add_argument('--no-gui', action='store_true', help='Skip the GUI benchmarks')
+    parser.add_argument('--output', help='Write the results as JSON to this file')
+    parser.add_argument('--baseline', help='Fail if slower than the results stored in this file')
+    parser.add_argument('--tolerance', type=float, default=0.25, help='Allowed slowdown against --baseline (default: 0.25)')
+    args = parser.parse_args()
+
+    sizes = [s.strip() for s in args.sizes.split(',') if s.strip()]
+    for size in sizes:
+        if size not in synth.SIZES:
+            parser.error(f"unknown size '{size}'")
+
+    work = Path(tempfile.mkdtemp(prefix='venvy-bench-'))
+    isolate(work / 'home')
+    suite = Suite(work, args.repeat, args.only)
+    gui = None
+    if not args.no_gui:
+        try:
+            gui = Gui()
+        except ImportError:
+            print("PyQt6 is not installed; skipping the GUI benchmarks", file=sys.stderr)
+    try:
+        # Fake interpreters are shell scripts
+        pythons = synth.fake_pythons(work / 'pythons', args.pythons, args.python_delay) if os.name != 'nt' else []
+        if pythons:
+            bench_probe(suite, pythons)
+        for size in sizes:
+            tree = work / 'trees' / size
+            venvs, dirs = synth.build_tree(tree, *synth.SIZES[size])
+            bench_discovery(suite, size, tree, venvs, dirs)
+            if gui is not None and suite.wanted('gui.*'):
+                bench_gui(suite, gui, size, tree, venvs)
+        if gui is not None and gui.window is not None and pythons:
+            bench_gui_pythons(suite, gui, pythons)
+        bench_create(suite)
+        if gui is not None and suite.wanted('startup'):
+            import startup
+            suite.run('startup', '-', startup.run_once)
+    finally:
+        if gui is not None:
+            gui.close()
+        shutil.rmtree(work, ignore_errors=True)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': suite.results,
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+        known = {(r['name'], r['size']) for r in baseline.get('results', [])}
+        if not any((r['name'], r['size']) in known for r in suite.results):
+            print(f"No benchmark of this run is in {args.baseline}; nothing was compared", file=sys.stderr)
+        regressions = compare(suite.results, baseline, args.tolerance)
+        for r in regressions:
+            print(f"REGRESSION {r['name']}[{r['size']}]: {r['median'] * 1000:.1f} ms "
+                  f"(baseline {r['baseline'] * 1000:.1f} ms)", file=sys.stderr)
+        if regressions:
+            sys.exit(1)
+
+if __name__ == '__main__':
+    main()
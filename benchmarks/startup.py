@@ -0,0 +1,58 @@
+"""Time Venvy's startup up to the first paint of the window.
+
+Runs "venvy.py --profile-startup" several times (offscreen unless
+QT_QPA_PLATFORM is set) and reports the median time, in ms since the start
+of venvy.py, at which each startup phase ended. "process" is the wall time
+of the whole run including interpreter start and exit.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+
+VENVY = Path(__file__).resolve().parent.parent / 'venvy.py'
+
+def run_once():
+    env = dict(os.environ)
+    env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, str(VENVY), '--profile-startup'],
+                          capture_output=True, text=True, env=env, timeout=120)
+    wall = (time.perf_counter() - start) * 1000
+    phases = {}
+    for line in proc.stderr.splitlines():
+        parts = line.rsplit(None, 2)
+        if len(parts) != 3:
+            continue
+        try:
+            phases[parts[0].strip()] = float(parts[2])
+        except ValueError:
+            continue  # Header or unrelated Qt output
+    if 'first paint' not in phases:
+        raise RuntimeError(f"venvy.py did not report a first paint:\n{proc.stderr}")
+    phases['process'] = wall
+    return phases
+
+def measure(runs=5):
+    """Median end time in ms of each startup phase over several runs."""
+    results = [run_once() for _ in range(runs)]
+    return {name: round(statistics.median(r[name] for r in results), 1) for name in results[0]}
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5, help='Number of runs (default: 5)')
+    parser.add_argument('--json', action='store_true', help='Print the result as JSON')
+    args = parser.parse_args()
+    medians = measure(args.runs)
+    if args.json:
+        print(json.dumps({'benchmark': 'startup', 'runs': args.runs, 'median_ms': medians}))
+    else:
+        for name, ms in medians.items():
+            print(f"{name:<24} {ms:9.1f} ms")
+
+if __name__ == '__main__':
+    main()
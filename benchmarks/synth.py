@@ -0,0 +1,83 @@
+"""Synthetic directory trees and interpreters for the benchmarks."""
+import os
+import time
+import random
+from pathlib import Path
+
+# Synthetic trees are dated this far back, well outside the index's racy window
+AGE = 86400
+
+# (venvs, plain directories, maximum nesting depth)
+SIZES = {
+    'small': (50, 500, 4),
+    'medium': (500, 5000, 6),
+    'large': (2000, 40000, 8),
+}
+
+FAKE_PYTHON = """#!/bin/sh
+# Answers the interpreter probe like a real Python, but slowly
+sleep {delay}
+echo 3.12.{minor}
+echo CPython
+echo x86_64 64bit
+"""
+
+def make_venv(path, version='3.12.1'):
+    """Lay out a minimal venv: pyvenv.cfg, an activate script and site-packages."""
+    path = Path(path)
+    (path / 'bin').mkdir(parents=True)
+    (path / 'lib' / f"python{version.rsplit('.', 1)[0]}" / 'site-packages').mkdir(parents=True)
+    (path / 'pyvenv.cfg').write_text(f"home = /usr/bin\nversion = {version}\n")
+    (path / 'bin' / 'activate').write_text("# activate\n")
+    return path
+
+def build_tree(root, venvs, dirs, depth, seed=0):
+    """Create dirs plain directories nested up to depth levels and venvs venvs among them.
+
+    Each plain directory holds one file, so listings are not trivially empty.
+    Returns (venv paths, plain directory paths).
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    made = [root]
+    parents = [(root, 0)]  # Directories that may still get children
+    for i in range(dirs):
+        parent, level = rng.choice(parents)
+        path = parent / f"d{i}"
+        path.mkdir()
+        (path / 'README').write_text("plain\n")
+        made.append(path)
+        if level + 1 < depth:
+            parents.append((path, level + 1))
+    venv_paths = []
+    for i in range(venvs):
+        parent = rng.choice(made)
+        name = '.venv' if not (parent / '.venv').exists() else f"venv{i}"
+        venv_paths.append(make_venv(parent / name))
+    backdate(root)
+    return venv_paths, made[1:]
+
+def backdate(root, age=AGE):
+    """Set every mtime below root age seconds back.
+
+    The index does not trust directories modified within its racy window and
+    lists them again, so a freshly built tree would make warm runs cold.
+    """
+    stamp = time.time() - age
+    for folder, dirs, files in os.walk(root):
+        for name in files:
+            os.utime(os.path.join(folder, name), (stamp, stamp))
+        os.utime(folder, (stamp, stamp))
+
+def fake_pythons(folder, count, delay):
+    """Write count shell scripts that answer the interpreter probe after delay seconds."""
+    folder = Path(folder)
+    folder.mkdir(parents=True, exist_ok=True)
+    paths = []
+    for i in range(count):
+        path = folder / f"python3.{i}"
+        path.write_text(FAKE_PYTHON.format(delay=delay, minor=i))
+        os.chmod(path, 0o755)
+        paths.append(str(path))
+    return paths
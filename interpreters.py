@@ -0,0 +1,106 @@
+import os
+import subprocess
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError
+from venvindex import JsonCache
+import venvtrace
+
+# Prints version, implementation and architecture, one per line
+PROBE_SCRIPT = (
+    "import platform; "
+    "print(platform.python_version()); "
+    "print(platform.python_implementation()); "
+    "print(platform.machine() + ' ' + platform.architecture()[0])"
+)
+
+def probe(exe, timeout=2):
+    """Run exe once and return {"version", "implementation", "arch"}, or None."""
+    venvtrace.count('spawn')
+    try:
+        out = subprocess.check_output([exe, '-c', PROBE_SCRIPT], stderr=subprocess.DEVNULL,
+                                      text=True, timeout=timeout)
+    except Exception:
+        return None
+    lines = out.split('\n')
+    if len(lines) < 3:
+        return None
+    return {'version': lines[0].strip(), 'implementation': lines[1].strip(), 'arch': lines[2].strip()}
+
+def stat_key(realpath):
+    venvtrace.count('stat')
+    st = os.stat(realpath)
+    return [st.st_ino, st.st_size, st.st_mtime_ns]
+
+class InterpreterCache(JsonCache):
+    """Persistent cache of interpreter details keyed on realpath, inode, size and mtime.
+
+    An interpreter is only run again when its binary changed on disk.
+    """
+
+    NAME = 'interpreters.json'  # realpath -> {"key": [ino, size, mtime_ns], "version": ..., ...}
+
+    def _fresh(self, realpath, key):
+        entry = self.entries.get(realpath)
+        return entry if entry and entry.get('key') == key else None
+
+    def cached(self, exe):
+        """Return the cached details for exe if the binary is unchanged, without probing."""
+        try:
+            realpath = os.path.realpath(exe)
+            key = stat_key(realpath)
+        except OSError:
+            return None
+        return self._fresh(realpath, key)
+
+    def lookup(self, exe, timeout=2):
+        """Return details for exe, probing it only if it is new or changed."""
+        try:
+            realpath = os.path.realpath(exe)
+            key = stat_key(realpath)
+        except OSError:
+            return None
+        entry = self._fresh(realpath, key)
+        if entry:
+            return entry
+        info = probe(exe, timeout)
+        if info is None:
+            return None
+        info['key'] = key
+        self.store(realpath, info)
+        return info
+
+def default_cache():
+    """Process-wide InterpreterCache instance."""
+    return InterpreterCache.default()
+
+def probe_all(exes, timeout=2, deadline=10, workers=8, cache=None, stop=None):
+    """Yield (exe, details) for each interpreter as soon as it is known.
+
+    Cached interpreters are yielded first without running anything. The rest
+    are probed concurrently on a bounded pool, each with its own timeout, and
+    probing stops once deadline seconds have passed or stop (an Event) is set.
+    Interpreters that fail or time out are yielded with details None.
+    """
+    cache = cache or default_cache()
+    pending = []
+    for exe in exes:
+        info = cache.cached(exe)
+        if info:
+            yield exe, info
+        else:
+            pending.append(exe)
+    if not pending:
+        return
+    pool = ThreadPoolExecutor(max_workers=min(workers, len(pending)))
+    lookup = venvtrace.bind(cache.lookup)
+    futures = {pool.submit(lookup, exe, timeout): exe for exe in pending}
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            if stop is not None and stop.is_set():
+                return
+            yield futures[future], future.result()
+    except TimeoutError:
+        pass  # Past the aggregate deadline: give up on the stragglers
+    finally:
+        for future in futures:
+            future.cancel()
+        pool.shutdown(wait=False)
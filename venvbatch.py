@@ -0,0 +1,170 @@
+import os
+import glob
+import shutil
+import subprocess
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+import venvdetect
+import venvmeta
+import venvpkgs
+import venvtemplate
+import venvtrash
+import venvtrace
+from venvindex import load_json
+from venvtemplate import Cancelled
+
+# Venvs worked on at once; most of the time goes to pip and venv processes
+JOBS = min(8, os.cpu_count() or 1)
+# Never reinstalled when recreating: pip comes with the new venv
+UNPINNED = {'pip'}
+
+def expand_targets(targets):
+    """Venvs named by targets, each a path or a glob such as "~/code/*/.venv".
+
+    Returns (venvs, misses): absolute venv paths in the order given, without
+    duplicates, and the targets that named no venv at all.
+    """
+    venvs = []
+    misses = []
+    for target in targets:
+        pattern = os.path.expanduser(target)
+        paths = sorted(glob.glob(pattern, recursive=True)) if glob.has_magic(pattern) else [pattern]
+        found = [os.path.abspath(p) for p in paths if venvdetect.detect(p)]
+        if not found:
+            misses.append(target)
+        venvs.extend(p for p in found if p not in venvs)
+    return venvs, misses
+
+def base_python(path, meta=None):
+    """The interpreter a venv was created from, or None if it is gone."""
+    meta = meta or venvmeta.metadata(path)
+    base = meta.get('base')
+    if not base:
+        return None
+    if os.path.isdir(base):
+        # pyvenv.cfg only had "home", the folder holding the interpreter
+        names = ['python.exe'] if os.name == 'nt' else ['python3', 'python']
+        base = next((os.path.join(base, n) for n in names if os.path.isfile(os.path.join(base, n))), None)
+    return base if base and os.path.isfile(base) else None
+
+def _pip(python, args, stop=None):
+    """Run "python -m pip install args" quietly; raises RuntimeError with pip's last error line."""
+    venvtrace.count('spawn')
+    cmd = [str(python), '-m', 'pip', 'install', '--quiet', '--disable-pip-version-check', *args]
+    proc = subprocess.Popen(cmd, stdin=subprocess.DEVNULL, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, text=True)
+    while True:
+        try:
+            _, stderr = proc.communicate(timeout=0.2)
+            break
+        except subprocess.TimeoutExpired:
+            if stop is not None and stop.is_set():
+                proc.kill()
+                proc.communicate()
+                raise Cancelled()
+    if proc.returncode:
+        lines = (stderr or '').strip().splitlines()
+        raise RuntimeError(lines[-1] if lines else f"pip exited with status {proc.returncode}")
+
+def _has_pip(path):
+    return any(name.lower() == 'pip' for name, _, _ in venvpkgs.inventory(path))
+
+def requirements(path):
+    """pip requirements that reinstall a venv's packages as they are installed now.
+
+    Returns (requirements, problems): problems names the packages no
+    requirement can reinstall, i.e. editable installs, installs from a local
+    folder or file, and packages whose version is unknown. pip is left out.
+    """
+    reqs = []
+    problems = []
+    for dist in venvpkgs.distributions(path):
+        name, version, _ = venvpkgs.read_distribution(dist)
+        if name.lower() in UNPINNED:
+            continue
+        # PEP 610: written by pip for anything not installed from an index
+        direct = load_json(Path(dist) / 'direct_url.json') if dist.endswith('.dist-info') else None
+        url = (direct or {}).get('url', '')
+        if direct and ('dir_info' in direct or url.startswith('file:')):
+            editable = direct.get('dir_info', {}).get('editable')
+            problems.append(f"{name} ({'editable install' if editable else 'installed'} from {url})")
+        elif direct and 'vcs_info' in direct:
+            vcs = direct['vcs_info']
+            reqs.append(f"{name} @ {vcs['vcs']}+{url}@{vcs.get('commit_id') or vcs.get('requested_revision')}")
+        elif direct:
+            reqs.append(f"{name} @ {url}")
+        elif version == '?':
+            problems.append(f"{name} (unknown version)")
+        else:
+            reqs.append(f"{name}=={version}")
+    return reqs, problems
+
+def upgrade_pip(path, stop=None):
+    """Upgrade pip in a venv; returns "upgraded", or "skipped" if it has no pip."""
+    if not _has_pip(path):
+        return 'skipped'
+    kind = venvdetect.detect(path)
+    _pip(venvdetect.python_path(path, kind), ['--upgrade', 'pip'], stop)
+    return 'upgraded'
+
+def recreate(path, python=None, stop=None, progress=None, skip_local=False):
+    """Rebuild a venv from scratch with the same interpreter and packages.
+
+    The interpreter is the venv's base one unless python is given (needed
+    when the base is gone). Installed packages are reinstalled at their
+    current versions (see requirements()); packages that cannot be are an
+    error before anything is touched, or left out if skip_local is set. The
+    old venv is moved to the trash first and moved back if anything fails;
+    on success its trash entry is returned for the caller to purge.
+    """
+    progress = progress or (lambda message: None)
+    path = os.path.abspath(str(path))
+    meta = venvmeta.metadata(path)
+    if meta['kind'] not in (venvdetect.VENV, venvdetect.VIRTUALENV):
+        raise ValueError(f"only venvs with a pyvenv.cfg can be recreated, not {meta['kind']}")
+    python = python or base_python(path, meta)
+    if not python:
+        raise ValueError(f"base interpreter missing: {meta.get('base')}")
+    reqs, problems = requirements(path)
+    if problems and not skip_local:
+        raise ValueError(f"cannot reinstall {', '.join(problems)}")
+    with_pip = _has_pip(path) or bool(reqs)
+    entry = venvtrash.trash(path)
+    try:
+        venvtemplate.create(path, python, with_pip=with_pip, stop=stop, progress=progress)
+        if reqs:
+            progress("Installing packages")
+            _pip(venvdetect.python_path(path, venvdetect.VENV), reqs, stop)
+    except BaseException as e:
+        shutil.rmtree(path, ignore_errors=True)
+        try:
+            venvtrash.restore(entry)
+        except OSError as restore_error:
+            raise RuntimeError(f"{e}; the old venv could not be moved back ({restore_error}) "
+                               f"and is in the trash as {entry['id']}") from e
+        raise
+    return entry
+
+def run(action, venvs, jobs=None, stop=None):
+    """Run action(venv) for every venv on one shared thread pool.
+
+    Yields (venv, result, error) as each one finishes, error being the
+    exception raised or None. Venvs not started yet when stop (an Event) is
+    set fail with Cancelled.
+    """
+    if not venvs:
+        return
+
+    def guarded(venv):
+        if stop is not None and stop.is_set():
+            raise Cancelled()
+        return action(venv)
+
+    with ThreadPoolExecutor(max_workers=min(len(venvs), jobs or JOBS)) as pool:
+        task = venvtrace.bind(guarded)
+        futures = {pool.submit(task, venv): venv for venv in venvs}
+        for future in as_completed(futures):
+            try:
+                yield futures[future], future.result(), None
+            except Exception as e:
+                yield futures[future], None, e
@@ -0,0 +1,222 @@
+import os
+import sys
+import stat
+import errno
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from venvindex import JsonCache
+import venvpkgs
+import venvscan
+import venvtemplate
+import venvtrace
+
+# Smaller files save little and are not worth a link each
+MIN_SIZE = 4096
+CHUNK = 1024 * 1024
+# Errors meaning the filesystem cannot reflink at all, rather than this one file failing
+NO_REFLINK = {errno.EOPNOTSUPP, errno.EXDEV, errno.EINVAL, errno.ENOTTY, errno.ENOSYS}
+
+class FileInfo:
+    __slots__ = ('path', 'dev', 'ino', 'size', 'mtime', 'mode', 'uid', 'gid', 'nlink')
+
+    def __init__(self, path, st):
+        self.path = path
+        self.dev = st.st_dev
+        self.ino = st.st_ino
+        self.size = st.st_size
+        self.mtime = st.st_mtime_ns
+        self.mode = stat.S_IMODE(st.st_mode)
+        self.uid = st.st_uid
+        self.gid = st.st_gid
+        self.nlink = st.st_nlink
+
+def _walk(top, min_size):
+    """Regular files of at least min_size bytes below top; symlinks are not followed."""
+    files = []
+    pending = [str(top)]
+    while pending:
+        path = pending.pop()
+        venvtrace.count('listdir')
+        try:
+            with os.scandir(path) as it:
+                entries = list(it)
+        except OSError:
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    pending.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=False):
+                    continue
+                st = entry.stat(follow_symlinks=False)
+            except OSError:
+                continue
+            venvtrace.count('stat')
+            if st.st_size >= min_size:
+                files.append(FileInfo(entry.path, st))
+    return files
+
+def site_files(venv, min_size=MIN_SIZE):
+    files = []
+    for site in venvpkgs.site_packages_dirs(venv):
+        files.extend(_walk(site, min_size))
+    return files
+
+def file_digest(path):
+    venvtrace.count('read')
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(CHUNK)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+class HashStore(JsonCache):
+    """Persistent content digests of files, keyed on device and inode.
+
+    A digest is reused while the file's size and mtime are unchanged, so
+    repeated dry runs only hash files that are new or were modified.
+    """
+
+    NAME = 'hashes.json'  # "dev:ino" -> [size, mtime_ns, sha256]
+
+    def digest(self, info):
+        key = f'{info.dev}:{info.ino}'
+        entry = self.entries.get(key)
+        if entry and entry[0] == info.size and entry[1] == info.mtime:
+            return entry[2]
+        try:
+            digest = file_digest(info.path)
+        except OSError:
+            return None
+        self.store(key, [info.size, info.mtime, digest])
+        return digest
+
+def find_duplicates(venvs, min_size=MIN_SIZE, store=None, workers=None):
+    """Group identical files in the site-packages of venvs.
+
+    Only files that could share an inode are compared: same device, size,
+    permissions and owner. Returns a list of groups, largest saving first:
+    {"digest", "size", "keep": FileInfo, "links": [FileInfo, ...], "reclaim": bytes}.
+    Files already hardlinked to the kept file are not listed again, and an
+    inode only counts as reclaimable once all of its links are replaced.
+    """
+    store = store or HashStore()
+    workers = workers or venvscan.default_workers()
+    with venvtrace.span('dedupe scan'), ThreadPoolExecutor(max_workers=workers) as pool:
+        files = [f for found in pool.map(venvtrace.bind(site_files), venvs, [min_size] * len(venvs))
+                 for f in found]
+    inodes = {}  # (dev, ino) -> files sharing it
+    for f in files:
+        inodes.setdefault((f.dev, f.ino), []).append(f)
+    candidates = {}
+    for key, links in inodes.items():
+        f = links[0]
+        candidates.setdefault((f.dev, f.size, f.mode, f.uid, f.gid), []).append(key)
+    # Only inodes with a same-sized twin are hashed
+    to_hash = [inodes[key][0] for keys in candidates.values() if len(keys) > 1 for key in keys]
+    with venvtrace.span('dedupe hash'), ThreadPoolExecutor(max_workers=workers) as pool:
+        digests = dict(zip(((f.dev, f.ino) for f in to_hash), pool.map(venvtrace.bind(store.digest), to_hash)))
+    store.save()
+
+    by_content = {}
+    for keys in candidates.values():
+        for key in keys:
+            digest = digests.get(key)
+            if digest:
+                f = inodes[key][0]
+                by_content.setdefault((digest, f.dev, f.mode, f.uid, f.gid), []).append(key)
+    groups = []
+    for (digest, *_), keys in by_content.items():
+        if len(keys) < 2:
+            continue
+        # Keep the inode with the most links so the fewest paths change
+        keys.sort(key=lambda k: (-len(inodes[k]), inodes[k][0].path))
+        keep = inodes[keys[0]][0]
+        links = [f for k in keys[1:] for f in inodes[k]]
+        reclaim = sum(inodes[k][0].size for k in keys[1:] if inodes[k][0].nlink <= len(inodes[k]))
+        groups.append({'digest': digest, 'size': keep.size, 'keep': keep, 'links': links, 'reclaim': reclaim})
+    groups.sort(key=lambda g: -g['reclaim'])
+    return groups
+
+class Linker:
+    """Replaces a file by a reflink (or, if allowed, a hardlink) to an identical one.
+
+    Reflinks are copy-on-write, so the venvs stay independent. Hardlinked
+    files are one file: an in-place edit shows up in every venv sharing it
+    (pip replaces files on upgrade, so it does not edit them in place).
+    """
+
+    def __init__(self, hardlink=False):
+        self.reflink = sys.platform.startswith('linux')
+        self.hardlink = hardlink
+
+    def available(self):
+        return self.reflink or self.hardlink
+
+    def _link(self, src, dst):
+        if self.reflink:
+            try:
+                return venvtemplate.reflink(src, dst)
+            except ImportError:
+                self.reflink = False
+            except OSError as e:
+                if e.errno not in NO_REFLINK:
+                    raise
+                self.reflink = False  # Not supported on this filesystem, don't try again
+            try:
+                os.unlink(dst)
+            except OSError:
+                pass
+        if not self.hardlink:
+            raise OSError(errno.EOPNOTSUPP, "reflinks are not supported here")
+        os.link(src, dst)
+
+    def __call__(self, keep, dup):
+        """Link dup to keep; returns False if either changed since they were scanned or dup cannot be linked."""
+        for info in (keep, dup):
+            try:
+                st = os.stat(info.path, follow_symlinks=False)
+            except OSError:
+                return False
+            if (st.st_ino, st.st_size, st.st_mtime_ns) != (info.ino, info.size, info.mtime):
+                return False
+        tmp = f'{dup.path}.{os.getpid()}.dedupe.tmp'
+        try:
+            self._link(keep.path, tmp)
+            os.replace(tmp, dup.path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+            return False
+        return True
+
+def dedupe(groups, link=None, stop=None):
+    """Link the duplicates of each group to its kept file with link (a Linker).
+
+    Returns (files linked, bytes reclaimed). Stops early when stop (an Event)
+    is set or link has no way left to link files on this filesystem.
+    """
+    link = link or Linker()
+    linked = reclaimed = 0
+    with venvtrace.span('dedupe link'):
+        for group in groups:
+            inodes = {}
+            for dup in group['links']:
+                inodes.setdefault((dup.dev, dup.ino), []).append(dup)
+            for dups in inodes.values():
+                done = 0
+                for dup in dups:
+                    if (stop is not None and stop.is_set()) or not link.available():
+                        return linked, reclaimed
+                    done += link(group['keep'], dup)
+                linked += done
+                # The inode is only freed once no path outside the venvs links to it
+                if done == len(dups) and dups[0].nlink <= len(dups):
+                    reclaimed += group['size']
+    return linked, reclaimed
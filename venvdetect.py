@@ -0,0 +1,67 @@
+import os
+from pathlib import Path
+import venvtrace
+
+# Environment kinds returned by classify()/detect()
+VENV = 'venv'
+VIRTUALENV = 'virtualenv'
+CONDA = 'conda'
+PYENV = 'pyenv'
+
+def _list_names(path):
+    venvtrace.count('listdir')
+    try:
+        with os.scandir(path) as it:
+            return {entry.name for entry in it}
+    except OSError:
+        return set()
+
+def _is_pyenv_version(path):
+    # pyenv installs live in $PYENV_ROOT/versions/<version>
+    path = Path(path)
+    if path.parent.name != 'versions':
+        return False
+    root = os.environ.get('PYENV_ROOT')
+    if root and os.path.normcase(str(path.parent.parent)) == os.path.normcase(root):
+        return True
+    return path.parent.parent.name in ('.pyenv', 'pyenv', 'pyenv-win')
+
+def classify(path, names):
+    """Classify a directory from the names in its listing.
+
+    Returns one of VENV, VIRTUALENV, CONDA, PYENV or None. At most one extra
+    listing (of bin/ or Scripts/) is made; no per-file exists() probes.
+    """
+    if 'conda-meta' in names:
+        return CONDA
+    if 'bin' in names:
+        scripts = _list_names(os.path.join(path, 'bin'))
+    elif 'Scripts' in names:
+        scripts = _list_names(os.path.join(path, 'Scripts'))
+    elif 'pyvenv.cfg' in names or 'python.exe' in names:
+        scripts = set()
+    else:
+        return None
+    if 'pyvenv.cfg' in names:
+        # virtualenv ships activate_this.py, the stdlib venv module does not
+        return VIRTUALENV if 'activate_this.py' in scripts else VENV
+    if 'activate' in scripts or 'activate.bat' in scripts:
+        # Legacy virtualenv (< 20) without pyvenv.cfg
+        return VIRTUALENV
+    if _is_pyenv_version(path) and ('python' in scripts or 'python.exe' in names):
+        return PYENV
+    return None
+
+def detect(path):
+    """Return the environment kind of path, or None if it is not one."""
+    names = _list_names(path)
+    if not names:
+        return None
+    return classify(str(path), names)
+
+def python_path(path, kind=None):
+    """Interpreter location for an environment of the given kind."""
+    path = Path(path)
+    if os.name == 'nt':
+        return path / ('python.exe' if kind in (CONDA, PYENV) else 'Scripts/python.exe')
+    return path / 'bin/python'
@@ -0,0 +1,117 @@
+import os
+import time
+import hashlib
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from venvindex import cache_dir, load_json, save_json, RACY_WINDOW_NS
+import venvscan
+import venvtrace
+
+def _allocated(st):
+    # Blocks actually allocated where the platform reports them, else the file size
+    blocks = getattr(st, 'st_blocks', None)
+    return blocks * 512 if blocks is not None else st.st_size
+
+def _scan_dir(path, cached):
+    """Size one directory: [mtime_ns, bytes in singly-linked files, [[dev, ino, bytes], ...], subdirs].
+
+    A directory whose mtime matches the cached entry is not listed again.
+    """
+    venvtrace.count('stat')
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    if cached and cached[0] == st.st_mtime_ns:
+        return cached
+    single = _allocated(st)
+    linked = []
+    subdirs = []
+    venvtrace.count('listdir')
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        subdirs.append(entry.name)
+                        continue
+                    est = entry.stat(follow_symlinks=False)
+                except OSError:
+                    continue
+                venvtrace.count('stat')
+                if est.st_nlink > 1:
+                    # Hardlinked: counted once per (dev, inode) when totalling
+                    linked.append([est.st_dev, est.st_ino, _allocated(est)])
+                else:
+                    single += _allocated(est)
+    except OSError:
+        pass
+    # Recently modified directories are listed again next time
+    mtime = st.st_mtime_ns if time.time_ns() - st.st_mtime_ns > RACY_WINDOW_NS else -1
+    return [mtime, single, linked, subdirs]
+
+def _cache_file(path):
+    digest = hashlib.sha1(os.path.abspath(str(path)).encode('utf-8', 'surrogateescape')).hexdigest()
+    return cache_dir() / 'sizes' / f'{digest[:16]}.json'
+
+def usage_tree(path, pool=None, use_cache=True):
+    """Walk path in parallel and return {relative dir: entry} as produced by _scan_dir."""
+    path = os.path.abspath(str(path))
+    cache_file = _cache_file(path)
+    old = {}
+    if use_cache:
+        data = load_json(cache_file)
+        if data and data.get('path') == path:
+            old = data.get('tree', {})
+    tree = {}
+    scan = venvtrace.bind(_scan_dir)
+    own_pool = pool is None
+    if own_pool:
+        pool = ThreadPoolExecutor(max_workers=venvscan.default_workers())
+    try:
+        pending = {pool.submit(scan, path, old.get('.')): '.'}
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                rel = pending.pop(future)
+                entry = future.result()
+                if entry is None:
+                    continue
+                tree[rel] = entry
+                for name in entry[3]:
+                    child = name if rel == '.' else os.path.join(rel, name)
+                    pending[pool.submit(scan, os.path.join(path, child), old.get(child))] = child
+    finally:
+        if own_pool:
+            pool.shutdown(wait=False)
+    if use_cache and tree != old:
+        save_json(cache_file, {'path': path, 'tree': tree})
+    return tree
+
+def forget(path):
+    """Drop the cached sizes of path, e.g. after its files were hardlinked from elsewhere."""
+    try:
+        os.unlink(_cache_file(path))
+    except FileNotFoundError:
+        pass
+
+def totals(trees):
+    """Total bytes over one or more usage trees, counting each hardlinked inode once."""
+    total = 0
+    inodes = {}
+    for tree in trees:
+        for entry in tree.values():
+            total += entry[1]
+            for dev, ino, size in entry[2]:
+                inodes[(dev, ino)] = size
+    return total + sum(inodes.values())
+
+def disk_usage(path, pool=None, use_cache=True):
+    """Bytes used below path; hardlinks are counted once and unchanged directories come from the cache."""
+    return totals([usage_tree(path, pool, use_cache)])
+
+def format_size(size):
+    for unit in ('B', 'KB', 'MB', 'GB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
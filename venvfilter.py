@@ -0,0 +1,129 @@
+from pathlib import Path
+
+# Query fields and their accepted spellings, e.g. "py:3.12" or "pkg:django"
+FIELDS = {
+    'path': 'path', 'name': 'name',
+    'py': 'python', 'python': 'python', 'version': 'python',
+    'kind': 'kind', 'type': 'kind',
+    'pkg': 'pkg', 'package': 'pkg',
+}
+
+def parse(query):
+    """Split a query into (field or None, text, fuzzy) terms; all terms must match.
+
+    A term is a substring, optionally limited to a field ("py:3.11", "pkg:numpy").
+    A leading "~" makes it a fuzzy match: its letters must appear in order
+    ("~mpj" matches "myproject").
+    """
+    terms = []
+    for word in query.lower().split():
+        field = None
+        prefix, sep, rest = word.partition(':')
+        if sep and prefix in FIELDS and rest:
+            field, word = FIELDS[prefix], rest
+        fuzzy = word.startswith('~') and len(word) > 1
+        terms.append((field, word[1:] if fuzzy else word, fuzzy))
+    return terms
+
+def record(path, meta=None, packages=None):
+    """Searchable fields of a venv: lists of lowercase strings per field.
+
+    meta is the venv's metadata (kind, version) and packages its package names.
+    """
+    path = Path(path)
+    meta = meta or {}
+    return {
+        'path': [str(path).lower()],
+        # Project folder too, since the venv itself is often just ".venv"
+        'name': [path.name.lower(), path.parent.name.lower()],
+        'python': [str(meta.get('version') or '').lower()],
+        'kind': [str(meta.get('kind') or '').lower()],
+        'pkg': [name.lower() for name in packages or []],
+    }
+
+def _subsequence(needle, haystack):
+    it = iter(haystack)
+    return all(c in it for c in needle)
+
+def _term_matches(fields, field, text, fuzzy):
+    if field:
+        names = [field]
+    elif fuzzy:
+        names = ['name', 'python', 'kind', 'pkg']  # Letters in order match almost any path
+    else:
+        names = list(fields)
+    for name in names:
+        for value in fields.get(name, ()):
+            if (_subsequence(text, value) if fuzzy else text in value):
+                return True
+    return False
+
+def matches(fields, terms):
+    """True if a record from record() matches every parsed term."""
+    return all(_term_matches(fields, *term) for term in terms)
+
+def _trigrams(text):
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class FilterIndex:
+    """Trigram index over venv records for fast incremental filtering.
+
+    A substring term of three or more characters only has to be checked
+    against records containing all of its trigrams; shorter and fuzzy terms
+    are checked against the candidates left by the other terms.
+    """
+
+    def __init__(self):
+        self.records = {}  # key -> fields from record()
+        self.grams = {}    # trigram -> set of keys
+
+    def add(self, key, fields):
+        """Index a record, replacing any previous record under key."""
+        self.remove(key)
+        self.records[key] = fields
+        for values in fields.values():
+            for value in values:
+                for gram in _trigrams(value):
+                    self.grams.setdefault(gram, set()).add(key)
+
+    def update(self, key, **fields):
+        """Replace some fields of an indexed record."""
+        if key in self.records:
+            self.add(key, dict(self.records[key], **fields))
+
+    def remove(self, key):
+        fields = self.records.pop(key, None)
+        if not fields:
+            return
+        for values in fields.values():
+            for value in values:
+                for gram in _trigrams(value):
+                    keys = self.grams.get(gram)
+                    if keys is not None:
+                        keys.discard(key)
+                        if not keys:
+                            del self.grams[gram]
+
+    def clear(self):
+        self.records = {}
+        self.grams = {}
+
+    def search(self, query):
+        """Keys of the records matching query (all keys for an empty query)."""
+        terms = parse(query) if isinstance(query, str) else query
+        candidates = None
+        for field, text, fuzzy in terms:
+            if fuzzy or len(text) < 3:
+                continue
+            for gram in _trigrams(text):
+                keys = self.grams.get(gram, set())
+                candidates = set(keys) if candidates is None else candidates & keys
+                if not candidates:
+                    return set()
+        if candidates is None:
+            candidates = self.records
+        return {key for key in candidates if matches(self.records[key], terms)}
+
+def needs_packages(terms):
+    """True if matching terms may need package names (which cost a read per venv)."""
+    return any(field in (None, 'pkg') for field, _, _ in terms)
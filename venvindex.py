@@ -0,0 +1,205 @@
+import os
+import sys
+import json
+import time
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+import venvscan
+import venvdetect
+import venvmeta
+import venvtrace
+
+INDEX_VERSION = 5
+# Directories modified this recently may change again within the same mtime tick
+RACY_WINDOW_NS = 2 * 10**9
+
+def cache_dir():
+    """Per-user cache directory for Venvy (created on demand)."""
+    if os.name == 'nt':
+        base = os.environ.get('LOCALAPPDATA') or str(Path.home() / 'AppData' / 'Local')
+    elif sys.platform == 'darwin':
+        base = str(Path.home() / 'Library' / 'Caches')
+    else:
+        base = os.environ.get('XDG_CACHE_HOME') or str(Path.home() / '.cache')
+    return Path(base) / 'venvy'
+
+def save_json(path, data):
+    """Atomically write data as compact JSON; errors are ignored since callers store caches."""
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + f'.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(data, f, separators=(',', ':'))
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+def load_json(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+class JsonCache:
+    """A persistent dict of cache entries, kept in one JSON file in the cache dir.
+
+    Subclasses set NAME to the file name and add entries with store(); save()
+    only writes when something was stored since the last save.
+    """
+
+    NAME = None
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else cache_dir() / self.NAME
+        self.entries = load_json(self.path) or {}
+        self.dirty = False
+        self._lock = threading.Lock()
+
+    def store(self, key, value):
+        with self._lock:
+            self.entries[key] = value
+            self.dirty = True
+
+    def save(self):
+        if not self.dirty:
+            return
+        with self._lock:
+            data = dict(self.entries)
+            self.dirty = False
+        save_json(self.path, data)
+
+    @classmethod
+    def default(cls):
+        """Process-wide instance of this cache."""
+        if cls.__dict__.get('_default') is None:
+            cls._default = cls()
+        return cls._default
+
+@contextmanager
+def file_lock(path):
+    """Hold an exclusive lock on the file path (created if needed), across processes."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'a+b') as f:
+        if os.name == 'nt':
+            import msvcrt
+            # Locks one byte at offset 0; LK_LOCK retries for ten seconds before failing
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+def _is_under(path, base):
+    return path == base or path.startswith(base.rstrip(os.sep) + os.sep)
+
+class VenvIndex:
+    """Persistent JSON index of scanned directories and the venvs found in them.
+
+    Each directory is stored with its mtime and its subdirectories. On refresh a
+    directory whose mtime is unchanged is only stat'ed, not listed again, so a
+    refresh costs one stat per directory plus a listing per changed directory.
+    """
+
+    def __init__(self, path=None):
+        self.path = Path(path) if path else cache_dir() / 'index.json'
+        self.dirs = {}   # path -> [mtime_ns, subdirs, environment kind or None]
+        self.venvs = {}  # path -> {"kind", "python", "version", "base", "creator", "mtime"}
+        self._lock = threading.Lock()
+        self.load()
+
+    def load(self):
+        data = load_json(self.path)
+        if not data or data.get('version') != INDEX_VERSION:
+            return
+        self.dirs = data.get('dirs', {})
+        self.venvs = data.get('venvs', {})
+
+    def save(self):
+        with self._lock:
+            data = {'version': INDEX_VERSION, 'dirs': dict(self.dirs), 'venvs': dict(self.venvs)}
+        save_json(self.path, data)
+
+    def _scan_cached(self, path):
+        venvtrace.count('stat')
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            return None, []
+        cached = self.dirs.get(path)
+        if cached and cached[0] == mtime:
+            return cached[2], cached[1]
+        kind, subdirs = venvscan.scan_dir(path)
+        stored = mtime if time.time_ns() - mtime > RACY_WINDOW_NS else -1
+        with self._lock:
+            self.dirs[path] = [stored, subdirs, kind]
+            if kind:
+                record = venvmeta.metadata(path, kind)
+                record['python'] = str(venvdetect.python_path(path, kind))
+                record['mtime'] = mtime
+                self.venvs[path] = record
+        return kind, subdirs
+
+    def _scan_full(self, path):
+        with self._lock:
+            self.dirs.pop(path, None)
+        return self._scan_cached(path)
+
+    def iter_venvs(self, base_path, ignore=None, max_depth=None, workers=None, rescan=False, stop=None,
+                   deadline=None):
+        """Yield venvs below base_path, re-listing only directories that changed."""
+        base = os.path.abspath(str(base_path))
+        seen = set()
+        scan = self._scan_full if rescan else self._scan_cached
+
+        # Templates and trashed venvs in our own cache are not user venvs
+        own_cache = str(cache_dir())
+
+        def tracked(path):
+            if path == own_cache:
+                return None, []
+            seen.add(path)
+            return scan(path)
+
+        for venv in venvscan.iter_venvs(base, ignore, max_depth, workers, scan=tracked, stop=stop,
+                                        deadline=deadline):
+            yield venv
+        # Only prune after a walk that ran to completion
+        stopped = stop is not None and stop.is_set()
+        if not stopped and (deadline is None or time.monotonic() < deadline):
+            self._prune(base, seen, max_depth)
+
+    def _prune(self, base, seen, max_depth=None):
+        # Forget directories under base that the walk no longer reaches; those
+        # below max_depth were not meant to be reached and are kept
+        def reachable(path):
+            if max_depth is None or path == base:
+                return True
+            return path[len(base.rstrip(os.sep)):].count(os.sep) <= max_depth
+
+        with self._lock:
+            for path in [p for p in self.dirs if _is_under(p, base) and p not in seen and reachable(p)]:
+                del self.dirs[path]
+            for path in [p for p in self.venvs if _is_under(p, base) and p not in self.dirs]:
+                del self.venvs[path]
+
+    def find_venvs(self, base_path, ignore=None, max_depth=None, workers=None, rescan=False):
+        return sorted(self.iter_venvs(base_path, ignore, max_depth, workers, rescan))
+
+    def subdirs(self, path):
+        """Subdirectories of path as of the last scan (empty if unknown or a venv other than a conda base)."""
+        cached = self.dirs.get(os.path.abspath(str(path)))
+        return list(cached[1]) if cached else []
+
+    def info(self, path):
+        return self.venvs.get(str(path))
@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import subprocess
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import venvdetect
+import venvtemplate
+
+# Written into each built env; it records the spec the env was built from
+MARKER = '.venvy-manifest.json'
+
+def load_manifest(manifest_path):
+    """Read a TOML manifest and return a list of env specs with absolute paths.
+
+    [defaults] holds keys shared by all envs; each [[env]] needs a path and may
+    set python, packages, requirements, without_pip.
+    """
+    try:
+        import tomllib
+    except ImportError:
+        try:
+            import tomli as tomllib
+        except ImportError:
+            raise RuntimeError("Reading manifests needs Python 3.11+ or the 'tomli' package")
+    manifest_path = Path(manifest_path)
+    with open(manifest_path, 'rb') as f:
+        data = tomllib.load(f)
+    base = manifest_path.parent
+    defaults = data.get('defaults', {})
+    specs = []
+    for env in data.get('env', []):
+        spec = dict(defaults)
+        spec.update(env)
+        if 'path' not in spec:
+            raise ValueError(f"{manifest_path}: every [[env]] needs a path")
+        spec['path'] = str((base / spec['path']).absolute())
+        if spec.get('requirements'):
+            spec['requirements'] = str((base / spec['requirements']).absolute())
+            if not os.access(spec['requirements'], os.R_OK):
+                raise ValueError(f"{manifest_path}: cannot read requirements file {spec['requirements']}")
+        python = spec.get('python')
+        spec['python'] = (shutil.which(python) or python) if python else sys.executable
+        spec['packages'] = list(spec.get('packages', []))
+        spec['without_pip'] = bool(spec.get('without_pip', False))
+        if spec['without_pip'] and (spec['packages'] or spec.get('requirements')):
+            raise ValueError(f"{manifest_path}: {spec['path']} sets without_pip but also packages or requirements")
+        specs.append(spec)
+    return specs
+
+def fingerprint(spec):
+    """Hash of everything that decides an env's contents."""
+    h = hashlib.sha256()
+    python = os.path.realpath(spec['python'])
+    h.update(python.encode('utf-8', 'surrogateescape'))
+    try:
+        st = os.stat(python)
+        h.update(f'{st.st_size}:{st.st_mtime_ns}'.encode())
+    except OSError:
+        pass
+    h.update(json.dumps([spec['packages'], spec['without_pip']]).encode())
+    if spec.get('requirements'):
+        with open(spec['requirements'], 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def is_up_to_date(spec, digest):
+    path = Path(spec['path'])
+    if not venvdetect.detect(path):
+        return False
+    try:
+        with open(path / MARKER, encoding='utf-8') as f:
+            return json.load(f).get('fingerprint') == digest
+    except (OSError, ValueError):
+        return False
+
+def build_env(spec):
+    """Build one env from its spec; runs in a worker process and never prompts."""
+    start = time.monotonic()
+    result = {'path': spec['path'], 'python': spec['python'], 'status': 'failed', 'seconds': 0.0, 'error': None}
+    try:
+        digest = fingerprint(spec)
+        if is_up_to_date(spec, digest):
+            result['status'] = 'skipped'
+            return result
+        path = Path(spec['path'])
+        if venvdetect.detect(path):
+            shutil.rmtree(path)
+        elif path.exists() and not (path.is_dir() and not any(path.iterdir())):
+            # Only environments are replaced; anything else at the path is left alone
+            raise ValueError(f"{path} exists and is not a virtual environment")
+        venvtemplate.create(path, spec['python'], with_pip=not spec['without_pip'])
+        pip_args = []
+        if spec.get('requirements'):
+            pip_args += ['-r', spec['requirements']]
+        pip_args += spec['packages']
+        if pip_args:
+            python = venvdetect.python_path(path, venvdetect.VENV)
+            subprocess.run([str(python), '-m', 'pip', 'install', '--quiet', *pip_args],
+                           check=True, capture_output=True, text=True)
+        with open(path / MARKER, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': digest, 'built': time.time()}, f)
+        result['status'] = 'created'
+    except subprocess.CalledProcessError as e:
+        stderr = (e.stderr or '').strip()
+        result['error'] = stderr.splitlines()[-1] if stderr else str(e)
+    except Exception as e:
+        result['error'] = str(e)
+    finally:
+        result['seconds'] = round(time.monotonic() - start, 3)
+    return result
+
+def build_all(specs, jobs=None):
+    """Build envs on a bounded process pool; yields each result as it finishes."""
+    if not specs:
+        return
+    with ProcessPoolExecutor(max_workers=jobs or min(len(specs), os.cpu_count() or 1)) as pool:
+        futures = [pool.submit(build_env, spec) for spec in specs]
+        for future in as_completed(futures):
+            yield future.result()
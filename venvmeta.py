@@ -0,0 +1,130 @@
+import os
+import re
+from pathlib import Path
+import venvdetect
+import venvtrace
+
+_PYTHON_NAME = re.compile(r'^python(\d+\.\d+)(?:\.exe)?$')
+_CONDA_PYTHON = re.compile(r'^python-(\d+\.\d+(?:\.\d+)?)-.*\.json$')
+
+def _open_noatime(path):
+    # Reading pyvenv.cfg must not look like a use of the venv (see last_used)
+    try:
+        fd = os.open(path, os.O_RDONLY | getattr(os, 'O_NOATIME', 0))
+    except PermissionError:
+        fd = os.open(path, os.O_RDONLY)  # O_NOATIME is only allowed on our own files
+    return open(fd, encoding='utf-8', errors='replace')
+
+def read_pyvenv_cfg(path):
+    """Return the key/value pairs of a venv's pyvenv.cfg (keys lowercased)."""
+    cfg = {}
+    try:
+        with _open_noatime(Path(path) / 'pyvenv.cfg') as f:
+            for line in f:
+                key, sep, value = line.partition('=')
+                if sep:
+                    cfg[key.strip().lower()] = value.strip()
+    except OSError:
+        pass
+    return cfg
+
+def _list_names(path):
+    venvtrace.count('listdir')
+    try:
+        return os.listdir(path)
+    except OSError:
+        return []
+
+def _version_from_names(names, pattern):
+    versions = [m.group(1) for m in map(pattern.match, names) if m]
+    if not versions:
+        return None
+    return max(versions, key=lambda v: tuple(int(p) for p in v.split('.')))
+
+def _conda_meta(path):
+    meta = {'creator': 'conda'}
+    meta['version'] = _version_from_names(_list_names(Path(path) / 'conda-meta'), _CONDA_PYTHON)
+    try:
+        with open(Path(path) / 'conda-meta' / 'history', encoding='utf-8', errors='replace') as f:
+            for line in f:
+                if line.startswith('# cmd:'):
+                    # e.g. "# cmd: /opt/conda/bin/mamba create -n ml python=3.11"
+                    words = line[len('# cmd:'):].split()
+                    if words and 'mamba' in os.path.basename(words[0]):
+                        meta['creator'] = 'mamba'
+                    break
+    except OSError:
+        pass
+    return meta
+
+def _layout_version(path):
+    # bin/python3.11 or lib/python3.11 name the interpreter version on Unix
+    path = Path(path)
+    version = _version_from_names(_list_names(path / 'bin'), _PYTHON_NAME)
+    if version is None:
+        version = _version_from_names(_list_names(path / 'lib'), _PYTHON_NAME)
+    return version
+
+def metadata(path, kind=None, probe=False):
+    """Return {"kind", "version", "base", "creator"} for an environment.
+
+    Everything is read from pyvenv.cfg, conda-meta and the directory layout. The
+    interpreter is only run when probe is true and nothing else gave a version.
+    """
+    path = Path(path)
+    kind = kind or venvdetect.detect(path)
+    meta = {'kind': kind, 'version': None, 'base': None, 'creator': None}
+    if kind == venvdetect.CONDA:
+        meta.update(_conda_meta(path))
+    elif kind == venvdetect.PYENV:
+        meta['creator'] = 'pyenv'
+        meta['version'] = path.name if re.match(r'^\d+\.\d+', path.name) else None
+    else:
+        cfg = read_pyvenv_cfg(path)
+        # virtualenv's version_info reads like "3.11.4.final.0"
+        meta['version'] = cfg.get('version') or '.'.join(cfg.get('version_info', '').split('.')[:3]) or None
+        meta['base'] = cfg.get('executable') or cfg.get('base-executable') or cfg.get('home')
+        if 'virtualenv' in cfg:
+            meta['creator'] = f"virtualenv {cfg['virtualenv']}"
+        elif 'uv' in cfg:
+            meta['creator'] = f"uv {cfg['uv']}"
+        elif cfg:
+            meta['creator'] = 'venv'
+    if meta['version'] is None:
+        meta['version'] = _layout_version(path)
+    if meta['version'] is None:
+        # Last resort: the interpreter cache, which only runs changed binaries
+        import interpreters
+        cache = interpreters.default_cache()
+        exe = venvdetect.python_path(path, kind)
+        info = cache.lookup(exe) if probe else cache.cached(exe)
+        if info:
+            meta['version'] = info['version']
+    return meta
+
+def last_used(path, kind=None):
+    """Best-effort timestamp of the last time an environment was used.
+
+    The interpreter reads pyvenv.cfg on every start, so its atime is a good
+    signal; conda envs fall back to conda-meta/history and then the folder mtime.
+    """
+    path = Path(path)
+    for candidate, attr in ((path / 'pyvenv.cfg', 'st_atime'),
+                            (path / 'conda-meta' / 'history', 'st_mtime'),
+                            (path, 'st_mtime')):
+        venvtrace.count('stat')
+        try:
+            return getattr(os.stat(candidate), attr)
+        except OSError:
+            continue
+    return None
+
+def describe(meta):
+    """One-line summary such as "venv, Python 3.11.4"."""
+    parts = [meta.get('kind') or 'unknown']
+    if meta.get('version'):
+        parts.append(f"Python {meta['version']}")
+    creator = meta.get('creator')
+    if creator and creator != meta.get('kind'):
+        parts.append(f"by {creator}")
+    return ', '.join(parts)
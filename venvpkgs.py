@@ -0,0 +1,149 @@
+import os
+import re
+import mmap
+from pathlib import Path
+from venvindex import JsonCache
+import venvtrace
+
+_NAME = re.compile(rb'^Name:[ \t]*(.+?)[ \t]*\r?$', re.M)
+_VERSION = re.compile(rb'^Version:[ \t]*(.+?)[ \t]*\r?$', re.M)
+
+def site_packages_dirs(path):
+    """Return the site-packages directories of an environment."""
+    path = Path(path)
+    dirs = []
+    for lib in ('lib', 'lib64'):
+        venvtrace.count('listdir')
+        try:
+            names = sorted(os.listdir(path / lib))
+        except OSError:
+            continue
+        for name in names:
+            if name.startswith('python'):
+                candidate = path / lib / name / 'site-packages'
+                if candidate.is_dir():
+                    dirs.append(candidate)
+    windows = path / 'Lib' / 'site-packages'
+    if windows.is_dir() and windows not in dirs:
+        dirs.append(windows)
+    # lib64 is often a symlink to lib
+    unique = []
+    for d in dirs:
+        if not any(os.path.samefile(d, u) for u in unique):
+            unique.append(d)
+    return unique
+
+def count_packages(path):
+    """Number of installed distributions (*.dist-info / *.egg-info) in an environment."""
+    count = 0
+    for site in site_packages_dirs(path):
+        venvtrace.count('listdir')
+        try:
+            with os.scandir(site) as it:
+                for entry in it:
+                    if entry.name.endswith(('.dist-info', '.egg-info')):
+                        count += 1
+        except OSError:
+            continue
+    return count
+
+def _map(path):
+    """Memory-map a file read-only; returns None for missing or empty files."""
+    try:
+        with open(path, 'rb') as f:
+            return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+def _read_headers(path):
+    # Only the header block (up to the first blank line) is looked at, the
+    # long description after it is never touched
+    mm = _map(path)
+    if mm is None:
+        return None, None
+    with mm:
+        end = mm.find(b'\n\n')
+        if end < 0:
+            end = len(mm)
+        header = mm[:end]
+    name = _NAME.search(header)
+    version = _VERSION.search(header)
+    return (name.group(1).decode('utf-8', 'replace') if name else None,
+            version.group(1).decode('utf-8', 'replace') if version else None)
+
+def _count_lines(path):
+    mm = _map(path)
+    if mm is None:
+        return 0
+    with mm:
+        count = mm[:].count(b'\n')
+        if len(mm) and mm[-1:] != b'\n':
+            count += 1
+    return count
+
+def read_distribution(dist_dir):
+    """Return (name, version, file count) for one *.dist-info or *.egg-info directory."""
+    dist_dir = Path(dist_dir)
+    if dist_dir.suffix == '.dist-info':
+        name, version = _read_headers(dist_dir / 'METADATA')
+        files = _count_lines(dist_dir / 'RECORD')
+    else:
+        name, version = _read_headers(dist_dir / 'PKG-INFO' if dist_dir.is_dir() else dist_dir)
+        files = _count_lines(dist_dir / 'installed-files.txt') if dist_dir.is_dir() else 0
+    if not name or not version:
+        # Fall back to the directory name: <name>-<version>.dist-info
+        stem_name, _, stem_version = dist_dir.stem.partition('-')
+        name = name or stem_name
+        version = version or stem_version.split('-')[0] or '?'
+    return name, version, files
+
+def _dist_dirs(site):
+    venvtrace.count('listdir')
+    try:
+        with os.scandir(site) as it:
+            return [entry.path for entry in it if entry.name.endswith(('.dist-info', '.egg-info'))]
+    except OSError:
+        return []
+
+def distributions(path):
+    """The *.dist-info and *.egg-info entries in a venv's site-packages."""
+    return [d for site in site_packages_dirs(path) for d in _dist_dirs(site)]
+
+def inventory(path):
+    """List installed packages as (name, version, file count), sorted by name.
+
+    Reads dist-info metadata directly; pip is never run.
+    """
+    packages = [read_distribution(d) for d in distributions(path)]
+    packages.sort(key=lambda p: p[0].lower())
+    return packages
+
+class PackageCache(JsonCache):
+    """Persistent per-venv package inventories, invalidated by site-packages mtime."""
+
+    NAME = 'packages.json'  # venv -> {"key": [...], "packages": [...]}
+
+    def _key(self, path):
+        key = []
+        for site in site_packages_dirs(path):
+            venvtrace.count('stat')
+            try:
+                key.append([str(site), os.stat(site).st_mtime_ns])
+            except OSError:
+                continue
+        return key
+
+    def get(self, path):
+        """Return the inventory of a venv, re-reading metadata only if site-packages changed."""
+        path = str(path)
+        key = self._key(path)
+        entry = self.entries.get(path)
+        if entry and entry.get('key') == key:
+            return [tuple(p) for p in entry['packages']]
+        packages = inventory(path)
+        self.store(path, {'key': key, 'packages': packages})
+        return packages
+
+def default_cache():
+    """Process-wide PackageCache instance."""
+    return PackageCache.default()
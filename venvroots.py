@@ -0,0 +1,169 @@
+import os
+import sys
+import time
+import fnmatch
+from pathlib import Path
+from venvindex import load_json, save_json
+import venvscan
+import venvtrace
+
+# Depth used for roots added by hand: deep enough for project/.venv and project/sub/.venv
+DEFAULT_DEPTH = 3
+# Folders under the home directory that usually hold projects with their own venvs
+PROJECT_DIRS = ['code', 'projects', 'src', 'dev', 'repos', 'work']
+
+def config_dir():
+    """Per-user configuration directory for Venvy."""
+    if os.name == 'nt':
+        base = os.environ.get('APPDATA') or str(Path.home() / 'AppData' / 'Roaming')
+    elif sys.platform == 'darwin':
+        base = str(Path.home() / 'Library' / 'Application Support')
+    else:
+        base = os.environ.get('XDG_CONFIG_HOME') or str(Path.home() / '.config')
+    return Path(base) / 'venvy'
+
+def _config_path():
+    return config_dir() / 'roots.json'
+
+def make_root(path, depth=1, include=None, exclude=None, budget=None):
+    """A search root: walk path at most depth levels deep (None: no limit).
+
+    exclude holds directory name globs skipped on top of venvscan.DEFAULT_IGNORE,
+    include (if set) path globs relative to path that a venv must match, and
+    budget a number of seconds after which the walk of this root gives up.
+    """
+    return {'path': str(Path(path).expanduser().absolute()), 'depth': depth,
+            'include': list(include or []), 'exclude': list(exclude or []), 'budget': budget}
+
+def default_roots():
+    """Common venv locations, used until roots are configured."""
+    home = Path.home()
+    roots = [make_root(home)]
+    roots += [make_root(home / name, DEFAULT_DEPTH) for name in PROJECT_DIRS]
+    for folder in ('.virtualenvs', 'venvs', 'virtualenvs', 'envs', '.venv',
+                   'Documents/Python/venvs', 'Documents/Python/virtualenvs'):
+        roots.append(make_root(home / folder))
+    return roots
+
+def environment_roots():
+    """Roots that depend on where and how Venvy was started."""
+    roots = [make_root(Path.cwd())]
+    for name in ('WORKON_HOME', 'VIRTUALENVWRAPPER_HOOK_DIR'):
+        if name in os.environ:
+            roots.append(make_root(os.environ[name]))
+    if 'VIRTUAL_ENV' in os.environ:
+        roots.append(make_root(Path(os.environ['VIRTUAL_ENV']).parent))
+    return roots
+
+def saved_roots():
+    """Configured roots, or the defaults if none were ever saved."""
+    data = load_json(_config_path())
+    if not data or 'roots' not in data:
+        return default_roots()
+    return [make_root(r['path'], r.get('depth'), r.get('include'), r.get('exclude'), r.get('budget'))
+            for r in data['roots']]
+
+def save_roots(roots):
+    save_json(_config_path(), {'roots': roots})
+
+def load_roots():
+    """Configured roots plus the environment roots, one entry per path."""
+    roots = {}
+    for root in saved_roots() + environment_roots():
+        roots.setdefault(root['path'], root)
+    return list(roots.values())
+
+def add_root(path, depth=DEFAULT_DEPTH, include=None, exclude=None, budget=None):
+    """Add or replace a configured root and save the configuration."""
+    root = make_root(path, depth, include, exclude, budget)
+    roots = [r for r in saved_roots() if r['path'] != root['path']]
+    roots.append(root)
+    save_roots(roots)
+    return root
+
+def remove_root(path):
+    """Remove a configured root; returns False if it was not configured."""
+    path = make_root(path)['path']
+    roots = saved_roots()
+    kept = [r for r in roots if r['path'] != path]
+    if len(kept) == len(roots):
+        return False
+    save_roots(kept)
+    return True
+
+def _included(venv, base, include):
+    rel = os.path.relpath(str(venv), base).replace(os.sep, '/')
+    return any(fnmatch.fnmatch(rel, pattern) for pattern in include)
+
+def iter_root(index, root, workers=None, rescan=False, stop=None, start=None):
+    """Yield the venvs of one root through index (a VenvIndex).
+
+    start limits the walk to a folder inside the root; the root's depth and
+    globs still apply as if the whole root was walked.
+    """
+    base = root['path']
+    start = str(start or base)
+    depth = root.get('depth')
+    if depth is not None and start != base:
+        depth -= len(Path(start).relative_to(base).parts)
+        if depth < 0:
+            return
+    budget = root.get('budget')
+    deadline = time.monotonic() + budget if budget else None
+    ignore = venvscan.DEFAULT_IGNORE + root.get('exclude', [])
+    include = root.get('include')
+    with venvtrace.span('scan', root=base):
+        for venv in index.iter_venvs(start, ignore, depth, workers, rescan, stop, deadline):
+            if not include or _included(venv, base, include):
+                yield venv
+
+def relative_depth(root, path):
+    """Levels path lies below root's folder, or -1 if root never walks into it."""
+    base = root['path']
+    if path != base and not path.startswith(base.rstrip(os.sep) + os.sep):
+        return -1
+    parts = Path(path).relative_to(base).parts
+    ignore = venvscan.DEFAULT_IGNORE + root.get('exclude', [])
+    if any(fnmatch.fnmatch(part, pattern) for part in parts for pattern in ignore):
+        return -1
+    return len(parts)
+
+def in_root(path, root):
+    """Whether a venv at path is one that root lists."""
+    level = relative_depth(root, path)
+    depth = root.get('depth')
+    if level < 0 or (depth is not None and level > depth):
+        return False
+    include = root.get('include')
+    return not include or _included(path, root['path'], include)
+
+def owner(roots, path):
+    """The root that searches deepest below path, or None if no root walks into it.
+
+    Roots overlap (the home folder is searched one level deep, ~/code three
+    levels), so a folder belongs to the root that can see the most of it.
+    """
+    best = None
+    best_left = -1
+    for root in roots:
+        level = relative_depth(root, path)
+        if level < 0:
+            continue
+        if root.get('depth') is None:
+            return root
+        left = root['depth'] - level
+        if left > best_left:
+            best, best_left = root, left
+    return best
+
+def cached_venvs(index, roots):
+    """Venvs the index already knows under roots, found without touching the disk."""
+    return [path for path in index.venvs if any(in_root(path, root) for root in roots)]
+
+def find_venvs(index, roots, workers=None, rescan=False):
+    """Sorted venvs found under any of roots; missing roots are skipped."""
+    found = set()
+    for root in roots:
+        if os.path.isdir(root['path']):
+            found.update(iter_root(index, root, workers, rescan))
+    return sorted(found)
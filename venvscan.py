@@ -0,0 +1,95 @@
+import os
+import time
+import fnmatch
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+import venvdetect
+import venvtrace
+
+# Directories that never contain venvs worth listing and can be huge
+DEFAULT_IGNORE = [
+    '.git', '.hg', '.svn',
+    'node_modules', '__pycache__',
+    '.tox', '.nox', '.mypy_cache', '.pytest_cache', '.ruff_cache',
+    '.venvy-trash',
+]
+
+def default_workers(per_cpu=4, limit=32):
+    """Thread count for I/O-bound pools: per_cpu threads per CPU, at most limit."""
+    return min(limit, (os.cpu_count() or 1) * per_cpu)
+
+def _is_ignored(name, ignore):
+    for pattern in ignore:
+        if fnmatch.fnmatch(name, pattern):
+            return True
+    return False
+
+def scan_dir(path):
+    """List one directory. Returns (environment kind or None, subdirectories)."""
+    venvtrace.count('listdir')
+    try:
+        with os.scandir(path) as it:
+            entries = list(it)
+    except OSError:
+        return None, []
+    kind = venvdetect.classify(path, {entry.name for entry in entries})
+    if kind == venvdetect.CONDA:
+        # A conda base install keeps its named environments in envs/
+        envs = os.path.join(path, 'envs')
+        return kind, [envs] if 'envs' in {entry.name for entry in entries} and os.path.isdir(envs) else []
+    if kind:
+        # An environment: no need to look inside lib/site-packages and friends
+        return kind, []
+    subdirs = []
+    for entry in entries:
+        try:
+            if entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.path)
+        except OSError:
+            continue
+    return None, subdirs
+
+def iter_venvs(base_path, ignore=None, max_depth=None, workers=None, scan=scan_dir, stop=None, deadline=None):
+    """Yield venv directories below base_path as they are found.
+
+    Every directory is listed exactly once with os.scandir, subtrees are spread
+    over a thread pool, and the walk stops descending at the first environment
+    (venv, virtualenv, conda or pyenv) it finds, except into a conda base
+    install's envs/ folder.
+    max_depth counts levels below base_path (0 only checks base_path itself).
+    scan can replace scan_dir, e.g. to serve unchanged directories from a cache.
+    stop is an optional threading.Event that ends the walk early, deadline an
+    optional time.monotonic() value after which the walk gives up.
+    """
+    ignore = DEFAULT_IGNORE if ignore is None else ignore
+    scan = venvtrace.bind(scan)
+    pool = ThreadPoolExecutor(max_workers=workers or default_workers())
+    pending = {pool.submit(scan, str(base_path)): (str(base_path), 0)}
+    try:
+        while pending:
+            if stop is not None and stop.is_set():
+                return
+            timeout = None
+            if deadline is not None:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    return
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            for future in done:
+                path, depth = pending.pop(future)
+                kind, subdirs = future.result()
+                if kind:
+                    yield Path(path)
+                    for sub in subdirs:
+                        # envs/<name> count as being at the conda base's own depth
+                        pending[pool.submit(scan, sub)] = (sub, depth - 1)
+                    continue
+                if max_depth is not None and depth >= max_depth:
+                    continue
+                for sub in subdirs:
+                    if not _is_ignored(os.path.basename(sub), ignore):
+                        pending[pool.submit(scan, sub)] = (sub, depth + 1)
+    finally:
+        for future in pending:
+            future.cancel()
+        pool.shutdown(wait=False)
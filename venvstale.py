@@ -0,0 +1,94 @@
+import os
+import re
+import time
+import threading
+from venvindex import load_json, save_json
+import venvdetect
+import venvmeta
+import venvroots
+import venvtrace
+
+# Venvs not used for this long are flagged as stale
+STALE_DAYS = 90
+DAY = 86400
+_UNITS = {'h': 3600, 'd': DAY, 'w': 7 * DAY, 'y': 365 * DAY}
+
+def parse_age(text):
+    """Seconds in an age such as "90d", "12w", "1y" or "36h"; a bare number is days."""
+    match = re.fullmatch(r'\s*(\d+(?:\.\d+)?)\s*([hdwy]?)\s*', text.lower())
+    if not match:
+        raise ValueError(f"invalid age '{text}' (use e.g. 90d, 12w, 1y)")
+    return float(match.group(1)) * _UNITS[match.group(2) or 'd']
+
+class ActivationLog:
+    """When each venv was last activated through Venvy (terminal or GUI).
+
+    Kept with the configuration rather than the cache: unlike everything in
+    the cache it cannot be rebuilt from the disk.
+    """
+
+    def __init__(self, path=None):
+        self.path = path or venvroots.config_dir() / 'activations.json'
+        self.entries = load_json(self.path) or {}  # venv -> timestamp
+        self._lock = threading.Lock()
+
+    def last(self, path):
+        return self.entries.get(str(path))
+
+    def record(self, path, when=None):
+        with self._lock:
+            # Re-read first so activations from other processes are kept
+            self.entries = load_json(self.path) or {}
+            self.entries[str(path)] = when or time.time()
+            data = dict(self.entries)
+        save_json(self.path, data)
+
+    def forget(self, paths):
+        with self._lock:
+            self.entries = load_json(self.path) or {}
+            for path in paths:
+                self.entries.pop(str(path), None)
+            data = dict(self.entries)
+        save_json(self.path, data)
+
+def record_activation(path):
+    ActivationLog().record(os.path.abspath(str(path)))
+
+def _missing(path):
+    venvtrace.count('stat')
+    return bool(path) and not os.path.exists(path)
+
+def score(path, meta=None, activations=None, now=None, older_than=STALE_DAYS * DAY):
+    """How used and how healthy a venv looks, from a few stats and no walk.
+
+    meta is the venv's index record (kind, python, base). Returns
+    {"path", "last_used", "idle_days", "broken", "stale"}: last_used is the
+    latest of its last activation through Venvy and pyvenv.cfg's atime (read
+    by the interpreter on every start), broken the reason the venv can no
+    longer run or None, and stale whether it is broken or idle for longer
+    than older_than seconds.
+    """
+    path = str(path)
+    meta = meta or venvmeta.metadata(path)
+    now = now or time.time()
+    used = [venvmeta.last_used(path, meta.get('kind')), activations.last(path) if activations else None]
+    used = [t for t in used if t]
+    last_used = max(used) if used else None
+    python = meta.get('python') or str(venvdetect.python_path(path, meta.get('kind')))
+    broken = None
+    if _missing(meta.get('base')):
+        broken = f"base interpreter missing: {meta['base']}"
+    elif _missing(python):
+        broken = "interpreter missing"
+    idle = (now - last_used) / DAY if last_used else None
+    stale = broken is not None or (idle is not None and idle * DAY > older_than)
+    return {'path': path, 'last_used': last_used, 'idle_days': idle, 'broken': broken, 'stale': stale}
+
+def score_all(index, venvs, older_than=STALE_DAYS * DAY):
+    """Score venvs from their index records in one pass, most idle first."""
+    activations = ActivationLog()
+    now = time.time()
+    with venvtrace.span('score'):
+        scores = [score(venv, index.info(venv), activations, now, older_than) for venv in venvs]
+    scores.sort(key=lambda s: -(s['idle_days'] or 0))
+    return scores
@@ -0,0 +1,253 @@
+import os
+import sys
+import json
+import shutil
+import hashlib
+import threading
+import subprocess
+from pathlib import Path
+from venvindex import cache_dir, load_json
+import interpreters
+import venvtrace
+
+# Linux ioctl that makes dst share src's extents (btrfs, xfs, ...)
+FICLONE = 0x40049409
+TEMPLATE_VERSION = 1
+# Longest "#!interpreter" line the kernel runs; longer ones are cut short
+MAX_SHEBANG = 512 if sys.platform == 'darwin' else 127
+
+# Installed as bin/pip when pip is bootstrapped lazily: the first call runs
+# ensurepip, which replaces this script with the real one, then re-executes it
+LAZY_PIP = """#!/bin/sh
+# Created by Venvy: installs pip on first use
+here="$(cd "$(dirname "$0")" && pwd)"
+"$here/python" -m ensurepip --default-pip >/dev/null || exit 1
+exec "$here/$(basename "$0")" "$@"
+"""
+
+class Cancelled(Exception):
+    """Raised when a creation or purge is stopped through its stop event."""
+
+def _run(cmd, stop=None):
+    """subprocess.run(cmd, check=True) that kills the child when stop is set."""
+    venvtrace.count('spawn')
+    if stop is None:
+        return subprocess.run(cmd, check=True)
+    proc = subprocess.Popen(cmd)
+    while True:
+        try:
+            proc.wait(timeout=0.2)
+            break
+        except subprocess.TimeoutExpired:
+            if stop.is_set():
+                proc.kill()
+                proc.wait()
+                raise Cancelled()
+    if proc.returncode:
+        raise subprocess.CalledProcessError(proc.returncode, cmd)
+
+def reflink(src, dst):
+    """Copy src to dst sharing its extents (copy-on-write); raises OSError where unsupported."""
+    import fcntl
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    shutil.copystat(src, dst)
+
+class _Copier:
+    """Copies files by reflink where the filesystem allows it, else hardlink or plain copy."""
+
+    def __init__(self, hardlink=False, stop=None):
+        self.reflink = sys.platform.startswith('linux')
+        self.hardlink = hardlink
+        self.stop = stop
+
+    def __call__(self, src, dst):
+        if self.stop is not None and self.stop.is_set():
+            raise Cancelled()
+        if self.reflink:
+            try:
+                return reflink(src, dst)
+            except (OSError, ImportError):
+                self.reflink = False  # Not supported here, don't try again
+                try:
+                    os.unlink(dst)
+                except OSError:
+                    pass
+        if self.hardlink:
+            try:
+                return os.link(src, dst)
+            except OSError:
+                self.hardlink = False
+        return shutil.copy2(src, dst)
+
+def _template_root(python_exec, with_pip):
+    realpath = os.path.realpath(python_exec)
+    digest = hashlib.sha1(f'{realpath}|{with_pip}'.encode('utf-8', 'surrogateescape')).hexdigest()[:12]
+    return cache_dir() / 'templates' / digest, f'venvy-tmpl-{digest}'
+
+def _stat_key(python_exec):
+    try:
+        return interpreters.stat_key(os.path.realpath(python_exec))
+    except OSError:
+        return None
+
+def template_path(python_exec, with_pip=True):
+    """Return (template venv, path it was built at) if present and fresh, else None."""
+    root, name = _template_root(python_exec, with_pip)
+    meta = load_json(root / 'template.json')
+    if not meta or meta.get('version') != TEMPLATE_VERSION:
+        return None
+    if meta.get('key') != _stat_key(python_exec) or not (root / name / 'pyvenv.cfg').exists():
+        return None  # The interpreter changed since the template was built
+    return root / name, meta['origin']
+
+def build_template(python_exec, with_pip=True, stop=None):
+    """(Re)build the pristine template venv for an interpreter.
+
+    The venv is built in a private folder and renamed into place, so several
+    processes (or threads) building the same template never see a half-built one.
+    """
+    root, name = _template_root(python_exec, with_pip)
+    build = root.with_name(f'{root.name}.{os.getpid()}-{threading.get_ident()}.tmp')
+    shutil.rmtree(build, ignore_errors=True)
+    build.mkdir(parents=True)
+    origin = build / name
+    cmd = [python_exec, '-m', 'venv', str(origin)]
+    if not with_pip:
+        cmd.insert(3, '--without-pip')
+    try:
+        _run(cmd, stop)
+        meta = {'version': TEMPLATE_VERSION, 'python': os.path.realpath(python_exec),
+                'key': _stat_key(python_exec), 'with_pip': with_pip, 'origin': str(origin)}
+        with open(build / 'template.json', 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+    except BaseException:
+        shutil.rmtree(build, ignore_errors=True)
+        raise
+    try:
+        if root.exists():
+            stale = root.with_name(f'{root.name}.{os.getpid()}-{threading.get_ident()}.stale')
+            os.rename(root, stale)
+            shutil.rmtree(stale, ignore_errors=True)
+        os.rename(build, root)
+    except OSError:
+        # Another process won the race; use its template
+        shutil.rmtree(build, ignore_errors=True)
+        if template_path(python_exec, with_pip) is None:
+            raise
+    return template_path(python_exec, with_pip)
+
+def _shebang(data, new_path):
+    """Run a script's interpreter through /bin/sh, as pip does, if its path is too long or has spaces."""
+    line, _, rest = data.partition(b'\n')
+    python = line[2:].strip()
+    if not line.startswith(b'#!') or new_path not in python:
+        return data
+    if len(line) + 1 <= MAX_SHEBANG and b' ' not in python:
+        return data
+    # Python reads the second line as a string; sh execs the interpreter with the script
+    return b"#!/bin/sh\n'''exec' \"" + python + b'" "$0" "$@"\n' + b"' '''\n" + rest
+
+def _rewrite(path, old_path, new_path, old_name, new_name):
+    # Scripts and activate files embed the venv's location and prompt name
+    try:
+        if os.path.islink(path) or os.path.getsize(path) > 1024 * 1024:
+            return
+        with open(path, 'rb') as f:
+            data = f.read()
+    except OSError:
+        return
+    if old_name not in data:
+        return
+    data = _shebang(data.replace(old_path, new_path).replace(old_name, new_name), new_path)
+    mode = os.stat(path).st_mode
+    os.unlink(path)  # Never write through a reflink/hardlink shared with the template
+    with open(path, 'wb') as f:
+        f.write(data)
+    os.chmod(path, mode)
+
+def clone(template, origin, target, hardlink=False, stop=None):
+    """Copy a template venv to target and repoint its scripts and pyvenv.cfg from origin to target."""
+    template = Path(template)
+    origin = Path(origin)
+    target = Path(target).absolute()
+    # Compiled files record the template's paths; they are rebuilt on first import
+    shutil.copytree(template, target, symlinks=True, copy_function=_Copier(hardlink, stop),
+                    ignore=shutil.ignore_patterns('__pycache__'))
+    old_path = os.fsencode(str(origin))
+    new_path = os.fsencode(str(target))
+    old_name = os.fsencode(origin.name)
+    new_name = os.fsencode(target.name)
+    _rewrite(target / 'pyvenv.cfg', old_path, new_path, old_name, new_name)
+    for scripts in ('bin', 'Scripts'):
+        if (target / scripts).is_dir():
+            for entry in os.scandir(target / scripts):
+                if entry.is_file(follow_symlinks=False):
+                    _rewrite(entry.path, old_path, new_path, old_name, new_name)
+    return target
+
+def install_lazy_pip(target):
+    """Put pip shims in a venv created without pip; the real pip is installed on first use."""
+    bin_dir = Path(target) / 'bin'
+    for name in ('pip', 'pip3'):
+        script = bin_dir / name
+        if not script.exists():
+            script.write_text(LAZY_PIP)
+            script.chmod(0o755)
+
+def create(target, python_exec=None, with_pip=True, lazy_pip=False, use_template=True, hardlink=False,
+           stop=None, progress=None):
+    """Create a venv at target, cloning a warm template when possible.
+
+    Returns "clone" or "venv" for the path taken. Without a fresh template for
+    the interpreter one is built first; if cloning is not possible (Windows, an
+    existing target folder, or any error while cloning) this falls back to a
+    normal "python -m venv" run. Errors starting or running the interpreter
+    are raised as they are rather than retried.
+
+    stop is an optional threading.Event; setting it kills a running "venv"
+    process or copy, removes the partial venv and raises Cancelled. progress
+    is called with a short message before each step.
+    """
+    progress = progress or (lambda message: None)
+    python_exec = python_exec or sys.executable
+    target = Path(target)
+    if lazy_pip:
+        with_pip = False
+    if target.exists() and not target.is_dir():
+        raise FileExistsError(f"{target} exists and is not a folder")
+    can_clone = use_template and os.name != 'nt' and not (target.exists() and any(target.iterdir()))
+    if can_clone:
+        try:
+            found = template_path(python_exec, with_pip)
+            if found is None:
+                progress("Building template")
+                found = build_template(python_exec, with_pip, stop)
+            template, origin = found
+            if target.exists():
+                target.rmdir()
+            progress("Cloning template")
+            clone(template, origin, target, hardlink, stop)
+            if lazy_pip:
+                install_lazy_pip(target)
+            return 'clone'
+        except (Cancelled, subprocess.CalledProcessError):
+            # "venv" failed for the template, it would fail the same way for target
+            shutil.rmtree(target, ignore_errors=True)
+            raise
+        except (OSError, shutil.Error) as e:
+            shutil.rmtree(target, ignore_errors=True)
+            if isinstance(e, OSError) and e.filename is not None and os.fspath(e.filename) == os.fspath(python_exec):
+                raise  # The interpreter itself cannot be started
+    cmd = [python_exec, '-m', 'venv', str(target)]
+    if not with_pip:
+        cmd.insert(3, '--without-pip')
+    progress("Running venv")
+    try:
+        _run(cmd, stop)
+    except Cancelled:
+        shutil.rmtree(target, ignore_errors=True)
+        raise
+    if lazy_pip and os.name != 'nt':
+        install_lazy_pip(target)
+    return 'venv'
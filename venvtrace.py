@@ -0,0 +1,170 @@
+import os
+import json
+import time
+import threading
+from collections import deque
+
+# Counters reported first, in this order; others follow alphabetically
+COUNTERS = ['listdir', 'stat', 'spawn']
+# Finished spans kept for the report; the GUI traces for as long as it runs
+MAX_SPANS = 10000
+
+_enabled = False
+_local = threading.local()
+_lock = threading.Lock()
+_spans = deque(maxlen=MAX_SPANS)
+_unscoped = {}  # Counts made outside any span
+_origin = time.perf_counter()
+
+class Span:
+    """A timed phase of work with its own counters; used as a context manager.
+
+    Counts made while a span is current (on its thread, or on pool threads
+    running functions wrapped by bind()) are added to it.
+    """
+
+    def __init__(self, name, root, parent):
+        self.name = name
+        self.root = root
+        self.parent = parent
+        self.counts = {}
+        self.thread = threading.get_ident()
+        self.start = self.end = None
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        _local.span = self
+        return self
+
+    def __exit__(self, *exc):
+        self.end = time.perf_counter()
+        # A generator closed late may end its span after another one started
+        if getattr(_local, 'span', None) is self:
+            _local.span = self.parent
+        with _lock:
+            _spans.append(self)
+        return False
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSpan()
+
+def enable(on=True):
+    global _enabled
+    _enabled = on
+
+def enabled():
+    return _enabled
+
+def reset():
+    """Forget everything recorded so far."""
+    global _origin
+    with _lock:
+        _spans.clear()
+        _unscoped.clear()
+        _origin = time.perf_counter()
+
+def current():
+    return getattr(_local, 'span', None)
+
+def span(name, root=None):
+    """Time a phase; root (a search root path) is inherited from the enclosing span."""
+    if not _enabled:
+        return _NULL
+    parent = current()
+    if root is None and parent is not None:
+        root = parent.root
+    return Span(name, str(root) if root is not None else None, parent)
+
+def count(name, n=1):
+    """Add n to a counter of the current span, e.g. count('stat')."""
+    if not _enabled:
+        return
+    target = current()
+    counts = target.counts if target is not None else _unscoped
+    with _lock:
+        counts[name] = counts.get(name, 0) + n
+
+def bind(fn):
+    """Wrap fn so that, run on a pool thread, it counts into the caller's current span."""
+    if not _enabled:
+        return fn
+    target = current()
+    if target is None:
+        return fn
+
+    def run(*args, **kwargs):
+        previous = current()
+        _local.span = target
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            _local.span = previous
+    return run
+
+def _finished():
+    with _lock:
+        return list(_spans), dict(_unscoped)
+
+def summary():
+    """Rows of {"phase", "root", "calls", "seconds", "counts"}, one per phase and root."""
+    spans, unscoped = _finished()
+    rows = {}
+    for s in spans:
+        row = rows.setdefault((s.name, s.root), {'phase': s.name, 'root': s.root, 'calls': 0,
+                                                 'seconds': 0.0, 'counts': {}})
+        row['calls'] += 1
+        row['seconds'] += s.end - s.start
+        for name, n in s.counts.items():
+            row['counts'][name] = row['counts'].get(name, 0) + n
+    result = sorted(rows.values(), key=lambda r: -r['seconds'])
+    if unscoped:
+        result.append({'phase': '(other)', 'root': None, 'calls': 0, 'seconds': 0.0, 'counts': unscoped})
+    return result
+
+def _counter_names(rows):
+    names = {name for row in rows for name in row['counts']}
+    return [n for n in COUNTERS if n in names] + sorted(names - set(COUNTERS))
+
+def format_table(rows=None):
+    """The summary as a plain-text table; times are inclusive of nested phases."""
+    rows = summary() if rows is None else rows
+    if not rows:
+        return "Nothing traced."
+    names = _counter_names(rows) or COUNTERS
+    phase_width = max(len('PHASE'), *(len(r['phase']) for r in rows))
+    header = f"{'PHASE':<{phase_width}} {'CALLS':>6} {'MS':>9}"
+    header += ''.join(f" {name.upper():>8}" for name in names)
+    lines = [header + "  ROOT"]
+    for row in rows:
+        line = f"{row['phase']:<{phase_width}} {row['calls']:>6} {row['seconds'] * 1000:>9.1f}"
+        line += ''.join(f" {row['counts'].get(name, 0):>8}" for name in names)
+        lines.append(line + f"  {row['root'] or '-'}")
+    return '\n'.join(lines)
+
+def chrome_trace():
+    """The recorded spans in Chrome's trace event format (chrome://tracing, Perfetto)."""
+    spans, unscoped = _finished()
+    pid = os.getpid()
+    events = []
+    for s in spans:
+        args = dict(s.counts)
+        if s.root:
+            args['root'] = s.root
+        events.append({'name': s.name, 'cat': 'venvy', 'ph': 'X', 'pid': pid, 'tid': s.thread,
+                       'ts': round((s.start - _origin) * 1e6, 1), 'dur': round((s.end - s.start) * 1e6, 1),
+                       'args': args})
+    events.sort(key=lambda e: e['ts'])
+    data = {'traceEvents': events, 'displayTimeUnit': 'ms'}
+    if unscoped:
+        data['otherData'] = {'unscoped': unscoped}
+    return data
+
+def write_chrome_trace(path):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(chrome_trace(), f)
@@ -0,0 +1,158 @@
+import os
+import stat
+import time
+import uuid
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from venvindex import cache_dir, file_lock, load_json, save_json
+from venvtemplate import Cancelled
+import venvscan
+
+# Used next to the venv when the cache dir is on another filesystem
+TRASH_NAME = '.venvy-trash'
+
+_lock = threading.Lock()
+
+def _registry_path():
+    return cache_dir() / 'trash.json'
+
+def _dirs_path():
+    # Local trash folders in use, so gc can find ones holding unregistered venvs
+    return cache_dir() / 'trash-dirs.json'
+
+@contextmanager
+def _locked():
+    """Serialize registry updates between threads and between Venvy processes."""
+    with _lock, file_lock(cache_dir() / 'trash.lock'):
+        yield
+
+def list_trash():
+    """Return trashed venvs as dicts with id, original, path and deleted_at."""
+    entries = load_json(_registry_path()) or []
+    return [e for e in entries if os.path.lexists(e['path'])]
+
+def _save(entries):
+    save_json(_registry_path(), entries)
+
+def _trash_dir_for(path):
+    # A rename is only atomic within one filesystem
+    parent = Path(path).absolute().parent
+    shared = cache_dir() / 'trash'
+    try:
+        shared.mkdir(parents=True, exist_ok=True)
+        if os.stat(shared).st_dev == os.stat(parent).st_dev:
+            return shared
+    except OSError:
+        pass
+    local = parent / TRASH_NAME
+    local.mkdir(exist_ok=True)
+    dirs = load_json(_dirs_path()) or []
+    if str(local) not in dirs:
+        save_json(_dirs_path(), dirs + [str(local)])
+    return local
+
+def trash(path):
+    """Move a venv into the trash with a single rename; returns its trash entry."""
+    path = Path(path).absolute()
+    entry_id = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    # Held across the rename so gc never sees the venv in the trash unregistered
+    with _locked():
+        dest = _trash_dir_for(path) / f'{path.name}-{entry_id}'
+        os.rename(path, dest)
+        entry = {'id': entry_id, 'original': str(path), 'path': str(dest), 'deleted_at': time.time()}
+        entries = list_trash()
+        entries.append(entry)
+        _save(entries)
+    return entry
+
+def _forget(entry_id):
+    with _locked():
+        _save([e for e in list_trash() if e['id'] != entry_id])
+
+def orphans():
+    """Paths in the trash folders that no trash entry refers to.
+
+    These are left behind when a process dies between moving a venv into
+    the trash and registering it.
+    """
+    with _locked():
+        known = {e['path'] for e in list_trash()}
+        folders = [cache_dir() / 'trash'] + [Path(d) for d in load_json(_dirs_path()) or []]
+        found = []
+        for folder in folders:
+            try:
+                names = sorted(os.listdir(folder))
+            except OSError:
+                continue
+            found.extend(str(folder / n) for n in names if str(folder / n) not in known)
+        return found
+
+def restore(entry):
+    """Move a trashed venv back to where it was deleted from."""
+    if os.path.lexists(entry['original']):
+        raise FileExistsError(f"{entry['original']} already exists")
+    os.rename(entry['path'], entry['original'])
+    _forget(entry['id'])
+    return Path(entry['original'])
+
+def _remove(path, remover):
+    try:
+        remover(path)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # Read-only files (common on Windows) cannot be removed until made writable
+        os.chmod(path, stat.S_IWRITE)
+        remover(path)
+
+def _unlink_dir_contents(root, dirs, files):
+    for name in files:
+        _remove(os.path.join(root, name), os.unlink)
+    for name in dirs:
+        child = os.path.join(root, name)
+        if os.path.islink(child):
+            _remove(child, os.unlink)
+
+def purge_path(path, pool, stop=None, progress=None):
+    """Delete a tree with its files unlinked in parallel on pool.
+
+    progress is called with a percentage; stop is an optional threading.Event.
+    """
+    if os.path.islink(path) or not os.path.isdir(path):
+        _remove(path, os.unlink)
+        if progress:
+            progress(100)
+        return
+    walk = list(os.walk(path, topdown=False))
+    futures = [pool.submit(_unlink_dir_contents, root, dirs, files) for root, dirs, files in walk]
+    last = -1
+    for done, future in enumerate(as_completed(futures), 1):
+        if stop is not None and stop.is_set():
+            for f in futures:
+                f.cancel()
+            raise Cancelled()
+        future.result()
+        percent = done * 100 // (len(futures) + 1)
+        if progress and percent != last:
+            progress(percent)
+            last = percent
+    # Folders are empty now; walk order is already bottom-up
+    for root, _, _ in walk:
+        if not os.path.islink(root):
+            _remove(root, os.rmdir)
+    if progress:
+        progress(100)
+
+def purge(entry, pool=None, stop=None, progress=None):
+    """Permanently delete a trashed venv."""
+    own_pool = pool is None
+    if own_pool:
+        pool = ThreadPoolExecutor(max_workers=venvscan.default_workers(2, 16))
+    try:
+        purge_path(entry['path'], pool, stop, progress)
+    finally:
+        if own_pool:
+            pool.shutdown(wait=True)
+    _forget(entry['id'])
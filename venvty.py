@@ -1,76 +1,277 @@
 import os
 import sys
+import csv
+import json
+import time
+import threading
 import subprocess
 from pathlib import Path
-import shutil
-import re
-
-def find_venvs(base_path):
-    venvs = []
-    for root, dirs, files in os.walk(base_path):
-        if 'pyvenv.cfg' in files:
-            venvs.append(Path(root))
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from venvindex import VenvIndex
+import venvdetect
+import interpreters
+import venvmeta
+import venvpkgs
+import venvdu
+import venvscan
+import venvtemplate
+import venvmanifest
+import venvtrash
+import venvroots
+import venvfilter
+import venvtrace
+import venvdedupe
+import venvstale
+import venvbatch
+
+DETAIL_FIELDS = ['path', 'kind', 'version', 'size', 'packages', 'last_used']
+
+def find_venvs(base_path, ignore=None, max_depth=None, workers=None, rescan=False, index=None, roots=None):
+    """Venvs below base_path, or below each of roots (search root dicts) if given."""
+    index = index or VenvIndex()
+    if roots is not None:
+        venvs = venvroots.find_venvs(index, roots, workers, rescan)
+    else:
+        with venvtrace.span('scan', root=base_path):
+            venvs = index.find_venvs(base_path, ignore, max_depth, workers, rescan)
+    with venvtrace.span('save index'):
+        index.save()
     return venvs
 
 def is_venv(path):
-    return (path / 'pyvenv.cfg').exists()
+    """Return the environment kind (venv, virtualenv, conda, pyenv) or None."""
+    return venvdetect.detect(path)
 
 def get_python_version(python_path):
-    try:
-        out = subprocess.check_output([python_path, '--version'], stderr=subprocess.STDOUT, text=True, timeout=2)
-        match = re.search(r'(\d+\.\d+\.\d+)', out)
-        return match.group(1) if match else "?"
-    except Exception:
-        return "?"
+    # Served from the interpreter cache unless the binary changed
+    info = interpreters.default_cache().lookup(python_path)
+    return info['version'] if info else "?"
 
 def list_installed_pythons():
     # Try to find all accessible python executables
     paths = set()
-    try:
-        output = subprocess.check_output(['where', 'python'], text=True, stderr=subprocess.DEVNULL)
-        for line in output.splitlines():
-            paths.add(line.strip())
-    except Exception:
-        pass
-    try:
-        output = subprocess.check_output(['where', 'python3'], text=True, stderr=subprocess.DEVNULL)
-        for line in output.splitlines():
-            paths.add(line.strip())
-    except Exception:
-        pass
-    try:
-        output = subprocess.check_output(['where', 'py'], text=True, stderr=subprocess.DEVNULL)
-        for line in output.splitlines():
-            paths.add(line.strip())
-    except Exception:
-        pass
+    for name in ('python', 'python3', 'py'):
+        venvtrace.count('spawn')
+        try:
+            output = subprocess.check_output(['where', name], text=True, stderr=subprocess.DEVNULL)
+            for line in output.splitlines():
+                paths.add(line.strip())
+        except Exception:
+            pass
     # Filter only unique, existing paths
     valid_paths = [p for p in paths if Path(p).exists()]
-    # Get version for each
+    # Get version for each, probing uncached interpreters concurrently
     python_infos = []
-    for p in valid_paths:
-        version = get_python_version(p)
-        python_infos.append((p, version))
+    for p, info in interpreters.probe_all(valid_paths):
+        python_infos.append((p, info['version'] if info else "?"))
+    interpreters.default_cache().save()
     # Sort by version descending
     python_infos.sort(key=lambda x: x[1], reverse=True)
     return python_infos
 
-def list_venvs(base_path):
-    venvs = find_venvs(base_path)
-    if not venvs:
-        print(f"No virtual environments found in {base_path}")
+def filter_venvs(venvs, query, index):
+    """Keep the venvs matching a filter query (see venvfilter.parse)."""
+    terms = venvfilter.parse(query)
+    with venvtrace.span('filter'):
+        if venvfilter.needs_packages(terms):
+            cache = venvpkgs.default_cache()
+            with ThreadPoolExecutor(max_workers=venvscan.default_workers()) as pool:
+                inventories = list(pool.map(venvtrace.bind(cache.get), venvs))
+            cache.save()
+        else:
+            inventories = [[] for _ in venvs]
+        kept = []
+        for venv, packages in zip(venvs, inventories):
+            meta = index.info(venv) or venvmeta.metadata(venv)
+            if venvfilter.matches(venvfilter.record(venv, meta, [p[0] for p in packages]), terms):
+                kept.append(venv)
+    return kept
+
+def list_venvs(base_path, ignore=None, max_depth=None, workers=None, rescan=False, details=False, fmt='table', jobs=None,
+               roots=None, query=None):
+    index = VenvIndex()
+    venvs = find_venvs(base_path, ignore, max_depth, workers, rescan, index, roots)
+    if query:
+        venvs = filter_venvs(venvs, query, index)
+    if details:
+        list_details(venvs, index, fmt, jobs)
+    elif not venvs and query:
+        print(f"No virtual environments match '{query}'")
+    elif not venvs:
+        print(f"No virtual environments found in {'the search roots' if roots is not None else base_path}")
     else:
         print("Found virtual environments:")
         for idx, venv in enumerate(venvs, 1):
-            print(f"  [{idx}] {venv}")
+            meta = index.info(venv) or venvmeta.metadata(venv)
+            print(f"  [{idx}] {venv} ({venvmeta.describe(meta)})")
     return venvs
 
-def create_venv(target_dir, python_exec=None):
+def venv_details(path, meta=None, pool=None):
+    """Collect version, size, package count and last-used time for one venv.
+
+    pool is an optional thread pool for sizing, shared between calls.
+    """
+    meta = meta or venvmeta.metadata(path)
+    version = meta.get('version')
+    if not version:
+        # At most one interpreter probe per venv, through the cache
+        version = venvmeta.metadata(path, meta.get('kind'), probe=True)['version']
+    used = venvmeta.last_used(path, meta.get('kind'))
+    return {
+        'path': str(path),
+        'kind': meta.get('kind'),
+        'version': version,
+        'size': venvdu.disk_usage(path, pool),
+        'packages': venvpkgs.count_packages(path),
+        'last_used': time.strftime('%Y-%m-%dT%H:%M:%S', time.localtime(used)) if used else None,
+    }
+
+def _row_writer(fmt):
+    if fmt == 'ndjson':
+        return lambda row: print(json.dumps(row), flush=True)
+    if fmt == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=DETAIL_FIELDS)
+        writer.writeheader()
+        def write(row):
+            writer.writerow(row)
+            sys.stdout.flush()
+        return write
+    print(f"{'KIND':<10} {'VERSION':<10} {'SIZE':>9} {'PKGS':>5} {'LAST USED':<19} PATH")
+    def write(row):
+        print(f"{row['kind'] or '?':<10} {row['version'] or '?':<10} {venvdu.format_size(row['size']):>9} "
+              f"{row['packages']:>5} {row['last_used'] or '?':<19} {row['path']}", flush=True)
+    return write
+
+def list_details(venvs, index=None, fmt='table', jobs=None):
+    """Print details for all venvs, one row per venv as soon as it is ready."""
+    write = _row_writer(fmt)
+    rows = []
+    # Sizing gets a pool of its own: its walks wait on their subtrees, which
+    # must not queue behind the detail tasks doing the waiting
+    with venvtrace.span('details'), ThreadPoolExecutor(max_workers=venvscan.default_workers()) as sizing, \
+            ThreadPoolExecutor(max_workers=jobs or venvscan.default_workers(2, 16)) as pool:
+        details = venvtrace.bind(venv_details)
+        futures = [pool.submit(details, venv, index.info(venv) if index else None, sizing) for venv in venvs]
+        for future in as_completed(futures):
+            row = future.result()
+            write(row)
+            rows.append(row)
+    interpreters.default_cache().save()
+    return rows
+
+def list_packages(path, fmt='table'):
+    """Print the packages installed in a venv, read from dist-info metadata."""
+    if not is_venv(path):
+        print(f"{path} is not a valid venv.")
+        return None
+    cache = venvpkgs.default_cache()
+    packages = cache.get(path)
+    cache.save()
+    rows = [{'name': name, 'version': version, 'files': files} for name, version, files in packages]
+    if fmt == 'ndjson':
+        for row in rows:
+            print(json.dumps(row))
+    elif fmt == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=['name', 'version', 'files'])
+        writer.writeheader()
+        writer.writerows(rows)
+    elif not rows:
+        print(f"No packages installed in {path}")
+    else:
+        width = max(len(row['name']) for row in rows)
+        print(f"{'NAME':<{width}} {'VERSION':<12} FILES")
+        for row in rows:
+            print(f"{row['name']:<{width}} {row['version']:<12} {row['files']}")
+    return packages
+
+def list_inventories(venvs, fmt='table'):
+    """Print the packages of several venvs, read concurrently; rows carry their venv."""
+    cache = venvpkgs.default_cache()
+    with venvtrace.span('packages'), ThreadPoolExecutor(max_workers=venvscan.default_workers()) as pool:
+        inventories = list(pool.map(venvtrace.bind(cache.get), venvs))
+    cache.save()
+    rows = [{'venv': str(venv), 'name': name, 'version': version, 'files': files}
+            for venv, packages in zip(venvs, inventories) for name, version, files in packages]
+    if fmt == 'ndjson':
+        for row in rows:
+            print(json.dumps(row))
+    elif fmt == 'csv':
+        writer = csv.DictWriter(sys.stdout, fieldnames=['venv', 'name', 'version', 'files'])
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        for venv, packages in zip(venvs, inventories):
+            print(f"{venv} ({len(packages)} packages)")
+            for name, version, files in packages:
+                print(f"  {name:<30} {version:<12} {files}")
+    return dict(zip(venvs, inventories))
+
+def disk_report(base_path, top=None, fmt='table', ignore=None, max_depth=None, workers=None, roots=None):
+    """Print venvs under base_path (or roots) by disk usage, largest first."""
+    venvs = find_venvs(base_path, ignore, max_depth, workers, roots=roots)
+    trees = {}
+    with venvtrace.span('size'), ThreadPoolExecutor(max_workers=venvscan.default_workers()) as pool:
+        for venv in venvs:
+            trees[venv] = venvdu.usage_tree(venv, pool)
+    sizes = sorted(((venvdu.totals([tree]), venv) for venv, tree in trees.items()), reverse=True)
+    shown = sizes[:top] if top else sizes
+    # Hardlinks shared between venvs are only counted once in the total
+    total = venvdu.totals(trees.values())
+    if fmt == 'ndjson':
+        for size, venv in shown:
+            print(json.dumps({'path': str(venv), 'size': size}))
+    elif fmt == 'csv':
+        writer = csv.writer(sys.stdout)
+        writer.writerow(['path', 'size'])
+        for size, venv in shown:
+            writer.writerow([str(venv), size])
+    elif not sizes:
+        print(f"No virtual environments found in {base_path}")
+    else:
+        for size, venv in shown:
+            print(f"{venvdu.format_size(size):>10}  {venv}")
+        print(f"{venvdu.format_size(total):>10}  total ({len(sizes)} venvs)")
+    return sizes
+
+def dedupe_venvs(base_path, dry_run=False, hardlink=False, min_size=venvdedupe.MIN_SIZE, top=10, ignore=None,
+                 max_depth=None, workers=None, roots=None):
+    """Replace identical files in the venvs' site-packages by links to one copy."""
+    venvs = find_venvs(base_path, ignore, max_depth, workers, roots=roots)
+    if not venvs:
+        print(f"No virtual environments found in {'the search roots' if roots is not None else base_path}")
+        return None
+    groups = venvdedupe.find_duplicates(venvs, min_size)
+    if not groups:
+        print(f"No duplicate files in {len(venvs)} venvs")
+        return groups
+    duplicates = sum(len(group['links']) for group in groups)
+    reclaimable = sum(group['reclaim'] for group in groups)
+    print(f"{'SAVES':>10} {'COPIES':>6}  FILE")
+    for group in groups[:top]:
+        name = group['keep'].path.split('site-packages' + os.sep, 1)[-1]
+        print(f"{venvdu.format_size(group['reclaim']):>10} {len(group['links']) + 1:>6}  {name}")
+    print(f"{duplicates} duplicate files in {len(venvs)} venvs, "
+          f"{venvdu.format_size(reclaimable)} reclaimable")
+    if dry_run:
+        return groups
+    link = venvdedupe.Linker(hardlink)
+    linked, reclaimed = venvdedupe.dedupe(groups, link)
+    if linked:
+        # Link counts changed in folders whose mtime did not, so cached sizes are wrong
+        for venv in venvs:
+            venvdu.forget(venv)
+    print(f"Linked {linked} files, reclaimed {venvdu.format_size(reclaimed)}")
+    if not link.available():
+        print("This filesystem does not support reflinks. Use --hardlink to hardlink the files instead "
+              "(an in-place edit of a hardlinked file then shows up in every venv sharing it).")
+    return groups
+
+def create_venv(target_dir, python_exec=None, with_pip=True, lazy_pip=False, use_template=True, hardlink=False):
     if not python_exec:
         pythons = list_installed_pythons()
         if not pythons:
             print("No Python executables found on your system.")
-            return
+            return False
         print("Select a Python executable to use:")
         for idx, (exe, version) in enumerate(pythons, 1):
             print(f"  [{idx}] {exe} (version {version})")
@@ -84,19 +285,208 @@ def create_venv(target_dir, python_exec=None):
                 break
             else:
                 print("Invalid selection. Try again.")
-    subprocess.run([python_exec, '-m', 'venv', str(target_dir)], check=True)
-    print(f"Created venv at {target_dir}")
-
-def delete_venv(path):
-    if is_venv(path):
-        confirm = input(f"Are you sure you want to delete the venv at {path}? (y/N): ")
-        if confirm.lower() == 'y':
-            shutil.rmtree(path)
-            print(f"Deleted venv at {path}")
+    try:
+        how = venvtemplate.create(target_dir, python_exec, with_pip, lazy_pip, use_template, hardlink)
+    except FileExistsError as e:
+        print(e, file=sys.stderr)
+        return False
+    print(f"Created venv at {target_dir}" + (" (cloned from template)" if how == 'clone' else ""))
+    return True
+
+def create_from_manifest(manifest, jobs=None, fmt='table'):
+    """Build every env in a manifest in parallel; returns False if any failed."""
+    try:
+        specs = venvmanifest.load_manifest(manifest)
+    except (OSError, ValueError, RuntimeError) as e:
+        print(e, file=sys.stderr)
+        return False
+    ok = True
+    if fmt == 'table':
+        print(f"{'STATUS':<8} {'SECONDS':>8}  PATH")
+    for result in venvmanifest.build_all(specs, jobs):
+        ok = ok and result['status'] != 'failed'
+        if fmt == 'ndjson':
+            print(json.dumps(result), flush=True)
         else:
-            print("Deletion cancelled.")
+            line = f"{result['status']:<8} {result['seconds']:>8.2f}  {result['path']}"
+            if result['error']:
+                line += f"\n         {result['error']}"
+            print(line, flush=True)
+    return ok
+
+def select_venvs(targets, query=None, base_path=None, ignore=None, max_depth=None, workers=None, roots=None):
+    """Venvs named by targets (paths or globs), or all found below base_path/roots, narrowed by query."""
+    index = VenvIndex()
+    if targets:
+        venvs, misses = venvbatch.expand_targets(targets)
+        for miss in misses:
+            print(f"{miss} is not a valid venv.")
     else:
-        print(f"{path} is not a valid venv.")
+        venvs = find_venvs(base_path, ignore, max_depth, workers, index=index, roots=roots)
+    if query:
+        venvs = filter_venvs(venvs, query, index)
+    return venvs
+
+def _confirm(question, yes=False):
+    return yes or input(f"{question} (y/N): ").lower() == 'y'
+
+def delete_venvs(venvs, keep=False, yes=False, listed=False):
+    """Move venvs to the trash and purge them in the background; listed means the caller printed them."""
+    if not venvs:
+        return []
+    if len(venvs) == 1:
+        question = f"Are you sure you want to delete the venv at {venvs[0]}?"
+    else:
+        if not listed:
+            for venv in venvs:
+                print(f"  {venv}")
+        question = f"Delete these {len(venvs)} venvs?"
+    if not _confirm(question, yes):
+        print("Deletion cancelled.")
+        return []
+    # The renames are instant; the files are removed afterwards
+    entries = []
+    for venv in venvs:
+        try:
+            entries.append(venvtrash.trash(venv))
+            print(f"Deleted venv at {venv}")
+        except OSError as e:
+            print(f"Could not delete {venv}: {e}")
+    venvstale.ActivationLog().forget(entry['original'] for entry in entries)
+    if keep:
+        for entry in entries:
+            print(f"Kept in trash as {entry['id']} (restore with: gc --restore {entry['id']})")
+    elif entries:
+        purge_in_background(entries)
+    return entries
+
+def run_batch(action, venvs, jobs=None):
+    """Run action on all venvs on one worker pool, printing each result as it finishes.
+
+    Returns the results of the venvs that succeeded; Ctrl-C stops the
+    running ones and skips the rest.
+    """
+    stop = threading.Event()
+    width = len(str(len(venvs)))
+    results = {}
+    failed = 0
+    batch = venvbatch.run(lambda venv: action(venv, stop), venvs, jobs, stop)
+    try:
+        for done, (venv, result, error) in enumerate(batch, 1):
+            status = 'failed' if error else (result if isinstance(result, str) else 'done')
+            print(f"[{done:>{width}}/{len(venvs)}] {status:<9} {venv}", flush=True)
+            if error:
+                failed += 1
+                print(f"{'':>{width * 2 + 13}} {str(error) or type(error).__name__}", flush=True)
+            else:
+                results[venv] = result
+    except KeyboardInterrupt:
+        stop.set()
+        batch.close()  # Waits for the running venvs to stop
+        print("Cancelled.")
+        failed = len(venvs) - len(results)
+    print(f"{len(results)} done, {failed} failed")
+    return results
+
+def recreate_venvs(venvs, python=None, jobs=None, keep=False, yes=False, skip_local=False):
+    """Rebuild venvs with the same interpreter and pinned packages, several at once."""
+    if not venvs:
+        return {}
+    for venv in venvs:
+        print(f"  {venv}")
+    if not _confirm(f"Recreate these {len(venvs)} venvs?", yes):
+        print("Recreation cancelled.")
+        return None
+    results = run_batch(lambda venv, stop: venvbatch.recreate(venv, python, stop, skip_local=skip_local), venvs, jobs)
+    entries = list(results.values())
+    if keep:
+        print("Old venvs kept in trash (see: gc --list)")
+    elif entries:
+        purge_in_background(entries)
+    return results
+
+def purge_in_background(entries):
+    """Start one detached 'gc --id' process that unlinks trashed venvs."""
+    kwargs = {'stdin': subprocess.DEVNULL, 'stdout': subprocess.DEVNULL, 'stderr': subprocess.DEVNULL}
+    if os.name == 'nt':
+        kwargs['creationflags'] = subprocess.DETACHED_PROCESS | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs['start_new_session'] = True
+    ids = [arg for entry in entries for arg in ('--id', entry['id'])]
+    subprocess.Popen([sys.executable, os.path.abspath(__file__), 'gc', *ids], **kwargs)
+
+def _idle(score):
+    return '?' if score['idle_days'] is None else f"{score['idle_days']:.0f}d"
+
+def prune_venvs(base_path, older_than, broken=False, dry_run=False, yes=False, keep=False, ignore=None,
+                max_depth=None, workers=None, roots=None):
+    """Delete venvs not used for older_than seconds, and broken ones if broken is set."""
+    index = VenvIndex()
+    venvs = find_venvs(base_path, ignore, max_depth, workers, index=index, roots=roots)
+    scores = venvstale.score_all(index, venvs, older_than)
+    selected = [s for s in scores if (s['idle_days'] or 0) * venvstale.DAY > older_than or (broken and s['broken'])]
+    if not selected:
+        print("No venvs to prune.")
+        return []
+    print(f"{'IDLE':>6}  PATH")
+    for s in selected:
+        print(f"{_idle(s):>6}  {s['path']}" + (f"  ({s['broken']})" if s['broken'] else ""))
+    if dry_run:
+        return selected
+    return delete_venvs([s['path'] for s in selected], keep=keep, yes=yes, listed=True)
+
+def collect_trash(ids=None, restore=None, list_only=False):
+    """Purge (in parallel), restore or list trashed venvs."""
+    entries = venvtrash.list_trash()
+    if list_only:
+        if not entries:
+            print("Trash is empty.")
+        for entry in entries:
+            deleted = time.strftime('%Y-%m-%d %H:%M', time.localtime(entry['deleted_at']))
+            print(f"  {entry['id']}  {deleted}  {entry['original']}")
+        return entries
+    if restore:
+        matches = [e for e in entries if restore in (e['id'], e['original'])]
+        if not matches:
+            print(f"Nothing in trash matches {restore}")
+            return []
+        print(f"Restored {venvtrash.restore(matches[-1])}")
+        return matches[-1:]
+    # A full gc also removes what a crashed delete left in the trash unregistered
+    orphans = [] if ids else venvtrash.orphans()
+    if ids:
+        entries = [e for e in entries if e['id'] in ids]
+    with ThreadPoolExecutor(max_workers=venvscan.default_workers(2, 16)) as pool:
+        for entry in entries:
+            venvtrash.purge(entry, pool)
+            print(f"Purged {entry['original']}")
+        for path in orphans:
+            venvtrash.purge_path(path, pool)
+            print(f"Purged unregistered {path}")
+    return entries
+
+def manage_roots(action, path=None, depth=venvroots.DEFAULT_DEPTH, include=None, exclude=None, budget=None):
+    """List, add or remove the search roots used by the GUI and --roots."""
+    if action == 'add':
+        root = venvroots.add_root(path, None if depth < 0 else depth, include, exclude, budget)
+        print(f"Added search root {root['path']}")
+    elif action == 'remove':
+        if venvroots.remove_root(path):
+            print(f"Removed search root {path}")
+        else:
+            print(f"{path} is not a configured search root")
+    else:
+        for root in venvroots.load_roots():
+            depth = 'any' if root['depth'] is None else root['depth']
+            extra = [f"depth {depth}"]
+            if root['include']:
+                extra.append(f"include {','.join(root['include'])}")
+            if root['exclude']:
+                extra.append(f"exclude {','.join(root['exclude'])}")
+            if root['budget']:
+                extra.append(f"budget {root['budget']:g}s")
+            missing = '' if os.path.isdir(root['path']) else ' [missing]'
+            print(f"  {root['path']} ({', '.join(extra)}){missing}")
 
 def activate_venv(path):
     if os.name == 'nt':
@@ -104,12 +494,14 @@ def activate_venv(path):
         if not activate_script.exists():
             print("Activation script not found.")
             return
+        venvstale.record_activation(path)
         subprocess.run(["cmd.exe", "/K", str(activate_script)])
     else:
         activate_script = path / 'bin' / 'activate'
         if not activate_script.exists():
             print("Activation script not found.")
             return
+        venvstale.record_activation(path)
         shell = os.environ.get('SHELL', '/bin/bash')
         subprocess.run([shell, '-i', '-c', f'source \"{activate_script}\" && exec {shell}'])
 
@@ -117,29 +509,145 @@ def main():
     import argparse
     parser = argparse.ArgumentParser(description="Venvy Terminal - Manage Python virtual environments from the terminal.")
     parser.add_argument('--base', type=str, default=str(Path.cwd()), help='Base directory to search for venvs (default: current directory)')
+    parser.add_argument('--ignore', action='append', metavar='GLOB', help='Directory name glob to skip while searching (repeatable, replaces the defaults)')
+    parser.add_argument('--max-depth', type=int, help='Maximum directory depth below --base to search')
+    parser.add_argument('--workers', type=int, help='Number of scanner threads')
+    parser.add_argument('--roots', action='store_true', help='Search the configured search roots (see "roots") instead of --base')
+    parser.add_argument('--trace', action='store_true', help='Print directory listings, stats, spawns and time per phase and search root to stderr')
+    parser.add_argument('--trace-json', metavar='FILE', help='Write the same trace as Chrome trace JSON (chrome://tracing, Perfetto)')
     subparsers = parser.add_subparsers(dest='command')
 
     parser_list = subparsers.add_parser('list', help='List all virtual environments')
+    parser_list.add_argument('--rescan', action='store_true', help='Ignore the cached index and walk the whole tree')
+    parser_list.add_argument('--details', action='store_true', help='Show version, size, package count and last use for every venv')
+    parser_list.add_argument('--format', choices=['table', 'csv', 'ndjson'], default='table', help='Output format for --details (default: table)')
+    parser_list.add_argument('--jobs', type=int, help='Number of venvs to inspect in parallel for --details')
+    parser_list.add_argument('--filter', metavar='QUERY', help='Only list matching venvs, e.g. "api py:3.12 pkg:django ~mpj"')
+    parser_packages = subparsers.add_parser('packages', help='List packages installed in virtual environments')
+    parser_packages.add_argument('targets', nargs='*', metavar='target', help='Venv path or glob, e.g. "~/code/*/.venv" (repeatable)')
+    parser_packages.add_argument('--filter', metavar='QUERY', help='Venvs matching this query, among the targets or found below --base/--roots')
+    parser_packages.add_argument('--format', choices=['table', 'csv', 'ndjson'], default='table', help='Output format (default: table)')
+    parser_du = subparsers.add_parser('du', help='Show disk usage of virtual environments, largest first')
+    parser_du.add_argument('--top', type=int, help='Only show the N largest venvs')
+    parser_du.add_argument('--format', choices=['table', 'csv', 'ndjson'], default='table', help='Output format (default: table)')
+    parser_dedupe = subparsers.add_parser('dedupe', help='Link identical files in the venvs\' site-packages to one copy')
+    parser_dedupe.add_argument('--dry-run', action='store_true', help='Only report the duplicates and the space they take')
+    parser_dedupe.add_argument('--hardlink', action='store_true', help='Hardlink files where reflinks are unavailable')
+    parser_dedupe.add_argument('--min-size', type=int, default=venvdedupe.MIN_SIZE, metavar='BYTES', help=f'Skip smaller files (default: {venvdedupe.MIN_SIZE})')
+    parser_dedupe.add_argument('--top', type=int, default=10, help='Number of largest duplicates to show (default: 10)')
     parser_create = subparsers.add_parser('create', help='Create a new virtual environment')
-    parser_create.add_argument('target', type=str, help='Target directory for new venv')
+    parser_create.add_argument('target', type=str, nargs='?', help='Target directory for new venv')
+    parser_create.add_argument('--manifest', type=str, help='TOML manifest of envs to build non-interactively')
+    parser_create.add_argument('--jobs', type=int, help='Number of envs to build at once with --manifest')
+    parser_create.add_argument('--format', choices=['table', 'ndjson'], default='table', help='Result format with --manifest (default: table)')
     parser_create.add_argument('--python', type=str, help='Python executable to use')
-    parser_delete = subparsers.add_parser('delete', help='Delete a virtual environment')
-    parser_delete.add_argument('target', type=str, help='Path to venv to delete')
+    parser_create.add_argument('--without-pip', action='store_true', help='Do not install pip into the new venv')
+    parser_create.add_argument('--lazy-pip', action='store_true', help='Install pip the first time it is run instead of now')
+    parser_create.add_argument('--no-template', action='store_true', help='Always run "python -m venv" instead of cloning a cached template')
+    parser_create.add_argument('--hardlink', action='store_true', help='Hardlink unchanged files from the template when reflinks are unavailable')
+    parser_delete = subparsers.add_parser('delete', help='Delete virtual environments')
+    parser_delete.add_argument('targets', nargs='*', metavar='target', help='Venv path or glob (repeatable)')
+    parser_delete.add_argument('--filter', metavar='QUERY', help='Venvs matching this query, among the targets or found below --base/--roots')
+    parser_delete.add_argument('--keep', action='store_true', help='Leave the venvs in the trash so they can be restored')
+    parser_delete.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    parser_recreate = subparsers.add_parser('recreate', help='Rebuild virtual environments with the same interpreter and packages')
+    parser_recreate.add_argument('targets', nargs='*', metavar='target', help='Venv path or glob (repeatable)')
+    parser_recreate.add_argument('--filter', metavar='QUERY', help='Venvs matching this query, among the targets or found below --base/--roots')
+    parser_recreate.add_argument('--python', type=str, help='Python executable to use instead of each venv\'s base interpreter')
+    parser_recreate.add_argument('--jobs', type=int, help=f'Number of venvs to rebuild at once (default: {venvbatch.JOBS})')
+    parser_recreate.add_argument('--keep', action='store_true', help='Leave the old venvs in the trash so they can be restored')
+    parser_recreate.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    parser_recreate.add_argument('--skip-local', action='store_true', help='Leave out packages that cannot be reinstalled (editable or local installs, unknown versions) instead of failing')
+    parser_upgrade = subparsers.add_parser('upgrade-pip', help='Upgrade pip in virtual environments')
+    parser_upgrade.add_argument('targets', nargs='*', metavar='target', help='Venv path or glob (repeatable)')
+    parser_upgrade.add_argument('--filter', metavar='QUERY', help='Venvs matching this query, among the targets or found below --base/--roots')
+    parser_upgrade.add_argument('--jobs', type=int, help=f'Number of venvs to upgrade at once (default: {venvbatch.JOBS})')
+    parser_gc = subparsers.add_parser('gc', help='Purge or restore deleted virtual environments')
+    parser_gc.add_argument('--list', action='store_true', help='List trashed venvs')
+    parser_gc.add_argument('--restore', type=str, metavar='ID_OR_PATH', help='Move a trashed venv back')
+    parser_gc.add_argument('--id', action='append', help='Only purge the trashed venv with this id (repeatable)')
+    parser_roots = subparsers.add_parser('roots', help='Show or change the search roots shared with the GUI')
+    parser_roots.add_argument('action', nargs='?', choices=['list', 'add', 'remove'], default='list')
+    parser_roots.add_argument('path', nargs='?', help='Folder to add or remove')
+    parser_roots.add_argument('--depth', type=int, default=venvroots.DEFAULT_DEPTH, help=f'Levels below the root to search (default: {venvroots.DEFAULT_DEPTH}, -1 for no limit)')
+    parser_roots.add_argument('--include', action='append', metavar='GLOB', help='Only list venvs whose path below the root matches (repeatable)')
+    parser_roots.add_argument('--exclude', action='append', metavar='GLOB', help='Directory name glob to skip on top of the defaults (repeatable)')
+    parser_roots.add_argument('--budget', type=float, metavar='SECONDS', help='Stop searching this root after this many seconds')
+    parser_prune = subparsers.add_parser('prune', help='Delete venvs that have not been used for a while')
+    parser_prune.add_argument('--older-than', default=f'{venvstale.STALE_DAYS}d', metavar='AGE', help=f'Idle time, e.g. 90d, 12w or 1y (default: {venvstale.STALE_DAYS}d)')
+    parser_prune.add_argument('--broken', action='store_true', help='Also delete venvs whose interpreter is gone, however recently used')
+    parser_prune.add_argument('--dry-run', action='store_true', help='Only list the venvs that would be deleted')
+    parser_prune.add_argument('--yes', action='store_true', help='Do not ask for confirmation')
+    parser_prune.add_argument('--keep', action='store_true', help='Leave the venvs in the trash so they can be restored')
     parser_activate = subparsers.add_parser('activate', help='Activate a virtual environment')
     parser_activate.add_argument('target', type=str, help='Path to venv to activate')
 
     args = parser.parse_args()
+    roots = venvroots.load_roots() if args.roots else None
+    venvtrace.enable(args.trace or bool(args.trace_json))
+    batch_parsers = {'packages': parser_packages, 'delete': parser_delete, 'recreate': parser_recreate,
+                     'upgrade-pip': parser_upgrade}
+    if args.command in batch_parsers and not (args.targets or args.filter):
+        batch_parsers[args.command].error('give venv paths or globs, or --filter')
 
-    if args.command == 'list':
-        list_venvs(Path(args.base))
-    elif args.command == 'create':
-        create_venv(Path(args.target), args.python)
-    elif args.command == 'delete':
-        delete_venv(Path(args.target))
-    elif args.command == 'activate':
-        activate_venv(Path(args.target))
-    else:
-        parser.print_help()
+    try:
+        with venvtrace.span(args.command or 'help'):
+            if args.command == 'list':
+                list_venvs(Path(args.base), args.ignore, args.max_depth, args.workers, args.rescan,
+                           args.details, args.format, args.jobs, roots, args.filter)
+            elif args.command in batch_parsers:
+                venvs = select_venvs(args.targets, args.filter, Path(args.base), args.ignore, args.max_depth,
+                                     args.workers, roots)
+                if not venvs:
+                    print("No virtual environments selected.")
+                elif args.command == 'packages' and len(venvs) == 1:
+                    list_packages(Path(venvs[0]), args.format)
+                elif args.command == 'packages':
+                    list_inventories(venvs, args.format)
+                elif args.command == 'delete':
+                    delete_venvs(venvs, args.keep, args.yes)
+                elif args.command == 'recreate':
+                    results = recreate_venvs(venvs, args.python, args.jobs, args.keep, args.yes, args.skip_local)
+                    if results is not None and len(results) < len(venvs):
+                        sys.exit(1)
+                elif len(run_batch(lambda venv, stop: venvbatch.upgrade_pip(venv, stop), venvs, args.jobs)) < len(venvs):
+                    sys.exit(1)
+            elif args.command == 'du':
+                disk_report(Path(args.base), args.top, args.format, args.ignore, args.max_depth, args.workers, roots)
+            elif args.command == 'dedupe':
+                dedupe_venvs(Path(args.base), args.dry_run, args.hardlink, args.min_size, args.top, args.ignore,
+                             args.max_depth, args.workers, roots)
+            elif args.command == 'create' and args.manifest:
+                if not create_from_manifest(args.manifest, args.jobs, args.format):
+                    sys.exit(1)
+            elif args.command == 'create':
+                if not args.target:
+                    parser_create.error('a target directory or --manifest is required')
+                if not create_venv(Path(args.target), args.python, not args.without_pip, args.lazy_pip,
+                                   not args.no_template, args.hardlink):
+                    sys.exit(1)
+            elif args.command == 'gc':
+                collect_trash(args.id, args.restore, args.list)
+            elif args.command == 'roots':
+                if args.action != 'list' and not args.path:
+                    parser_roots.error(f'{args.action} needs a path')
+                manage_roots(args.action, args.path, args.depth, args.include, args.exclude, args.budget)
+            elif args.command == 'prune':
+                try:
+                    older_than = venvstale.parse_age(args.older_than)
+                except ValueError as e:
+                    parser_prune.error(str(e))
+                prune_venvs(Path(args.base), older_than, args.broken, args.dry_run, args.yes, args.keep,
+                            args.ignore, args.max_depth, args.workers, roots)
+            elif args.command == 'activate':
+                activate_venv(Path(args.target))
+            else:
+                parser.print_help()
+    finally:
+        if args.trace:
+            print(venvtrace.format_table(), file=sys.stderr)
+        if args.trace_json:
+            venvtrace.write_chrome_trace(args.trace_json)
 
 if __name__ == "__main__":
     main()
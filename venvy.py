@@ -1,57 +1,205 @@
+import time
+
+# Timestamps for --profile-startup, the first one taken before any other import
+STARTUP_MARKS = [("start", time.perf_counter())]
+
+def mark_startup(name):
+    STARTUP_MARKS.append((name, time.perf_counter()))
+
 import os
 import sys
 import subprocess
 from pathlib import Path
 from PyQt6.QtWidgets import (
     QApplication, QWidget, QVBoxLayout, QPushButton,
-    QFileDialog, QListWidget, QLabel, QHBoxLayout, QInputDialog, QMessageBox, QFrame, QScrollArea, QLineEdit, QComboBox, QDialog, QMenu, QToolTip
+    QFileDialog, QTableView, QHeaderView, QLabel, QHBoxLayout, QInputDialog, QMessageBox, QFrame, QScrollArea, QLineEdit, QComboBox, QDialog, QMenu, QToolTip, QProgressBar, QPlainTextEdit
 )
-from PyQt6.QtCore import Qt, QSize, QRect, QPropertyAnimation, QEasingCurve
+from PyQt6.QtCore import Qt, QSize, QRect, QPropertyAnimation, QEasingCurve, QObject, QEvent, QThread, QThreadPool, QRunnable, QTimer, QFileSystemWatcher, QAbstractTableModel, QModelIndex, QSortFilterProxyModel, pyqtSignal
 from PyQt6.QtGui import QFont, QPalette, QColor, QIcon, QCursor
+mark_startup("import PyQt6")
 import fnmatch
+import glob
+import threading
+import html
+from collections import OrderedDict
+from array import array
+from venvindex import VenvIndex
+import venvdetect
+import interpreters
+import venvmeta
+import venvpkgs
+import venvdu
+import venvroots
+import venvscan
+import venvfilter
+import venvtrace
+import venvstale
+from concurrent.futures import ThreadPoolExecutor
+# venvtemplate and venvtrash are imported when a venv is first created or deleted
+mark_startup("import venvy modules")
+
+# Above this many separate blocks of rows, a bulk removal resets the model instead
+REMOVE_RANGES = 64
+
+# Applied once to the whole application; widgets are styled by type and object name
+STYLESHEET = """
+    QWidget {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+    }
+    QLabel {
+        font-size: 13px;
+        color: #B0B0B0;
+    }
+    QLabel#title {
+        font-size: 20px;
+        font-weight: bold;
+        color: #4CAF50;
+        padding: 8px;
+    }
+    ModernButton {
+        background-color: #4CAF50;
+        color: white;
+        border: none;
+        border-radius: 4px;
+        padding: 6px 12px;
+        font-size: 13px;
+    }
+    ModernButton:hover {
+        background-color: #388E3C;
+    }
+    ModernButton:pressed {
+        background-color: #2E7D32;
+    }
+    QTableView {
+        background-color: #2D2D2D;
+        border: 1px solid #3D3D3D;
+        border-radius: 4px;
+        padding: 4px;
+        font-size: 13px;
+    }
+    QTableView::item {
+        padding: 8px;
+        border-bottom: 1px solid #3D3D3D;
+    }
+    QTableView::item:selected {
+        background-color: #2E7D32;
+        color: white;
+    }
+    QHeaderView::section {
+        background-color: #2D2D2D;
+        color: #B0B0B0;
+        border: none;
+        border-bottom: 1px solid #3D3D3D;
+        padding: 4px;
+    }
+    QMenu {
+        background-color: #2D2D2D;
+        border: 1px solid #3D3D3D;
+        color: #E0E0E0;
+    }
+    QMenu::item {
+        padding: 5px 20px;
+    }
+    QMenu::item:selected {
+        background-color: #2E7D32;
+    }
+    QScrollArea {
+        border: none;
+    }
+    QScrollBar:vertical {
+        border: none;
+        background: #1E1E1E;
+        width: 8px;
+        margin: 0px;
+    }
+    QScrollBar::handle:vertical {
+        background: #4CAF50;
+        min-height: 20px;
+        border-radius: 4px;
+    }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+        height: 0px;
+    }
+    QLineEdit#filter {
+        background-color: #2D2D2D;
+        border: 1px solid #3D3D3D;
+        border-radius: 4px;
+        padding: 6px;
+        color: #E0E0E0;
+    }
+    QFrame#info, QFrame#info QFrame {
+        background-color: #2D2D2D;
+        border: 1px solid #3D3D3D;
+        border-radius: 4px;
+        padding: 6px;
+    }
+    QFrame#info QPushButton {
+        background-color: #4CAF50;
+        color: white;
+        border: none;
+        border-radius: 2px;
+        padding: 2px 5px;
+        font-size: 11px;
+    }
+    QFrame#info QPushButton:hover {
+        background-color: #388E3C;
+    }
+    QFrame#info QPushButton:pressed {
+        background-color: #2E7D32;
+    }
+    QFrame#info QLabel {
+        color: #B0B0B0;
+        font-size: 12px;
+    }
+    QFrame#info QFrame#separator {
+        background-color: #3D3D3D;
+    }
+    CollapsibleSection, CollapsibleSection QWidget {
+        background-color: #2D2D2D;
+    }
+    QFrame#info CollapsibleSection QPushButton {
+        text-align: left;
+        padding: 4px;
+        border: none;
+        color: #E0E0E0;
+        font-weight: bold;
+        background-color: #2D2D2D;
+    }
+    QFrame#info CollapsibleSection QPushButton:hover {
+        color: #FFFFFF;
+        background-color: #2D2D2D;
+    }
+    QDialog {
+        background-color: #1E1E1E;
+        color: #E0E0E0;
+    }
+    QPlainTextEdit#trace {
+        background-color: #2D2D2D;
+        border: 1px solid #3D3D3D;
+        font-family: monospace;
+        font-size: 12px;
+    }
+    QDialog QLineEdit, QDialog QComboBox {
+        background-color: #2D2D2D;
+        border: 1px solid #3D3D3D;
+        border-radius: 4px;
+        padding: 5px;
+        color: #E0E0E0;
+        min-width: 200px;
+    }
+"""
 
 class ModernButton(QPushButton):
     def __init__(self, text, parent=None):
         super().__init__(text, parent)
         self.setFixedHeight(35)  # Slightly smaller height
         self.setCursor(Qt.CursorShape.PointingHandCursor)
-        self.setStyleSheet("""
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                border-radius: 4px;
-                padding: 6px 12px;
-                font-size: 13px;
-            }
-            QPushButton:hover {
-                background-color: #388E3C;
-            }
-            QPushButton:pressed {
-                background-color: #2E7D32;
-            }
-        """)
 
 class CollapsibleSection(QWidget):
     def __init__(self, title, parent=None):
         super().__init__(parent)
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #2D2D2D;
-            }
-            QPushButton {
-                text-align: left;
-                padding: 4px;
-                border: none;
-                color: #E0E0E0;
-                font-weight: bold;
-                background-color: #2D2D2D;
-            }
-            QPushButton:hover {
-                color: #FFFFFF;
-                background-color: #2D2D2D;
-            }
-        """)
+        self.title = title
         
         self.layout = QVBoxLayout(self)
         self.layout.setSpacing(0)
@@ -73,7 +221,7 @@ class CollapsibleSection(QWidget):
         
         self.animation = QPropertyAnimation(self.content, b"maximumHeight")
         self.animation.setDuration(200)
-        self.animation.setEasingCurve(QEasingCurve.InOutQuad)
+        self.animation.setEasingCurve(QEasingCurve.Type.InOutQuad)
         
         self.update_arrow()
         
@@ -84,52 +232,660 @@ class CollapsibleSection(QWidget):
         
     def update_arrow(self):
         arrow = "▼" if self.toggle_button.isChecked() else "▶"
-        self.toggle_button.setText(f"{arrow} Paths")
+        self.toggle_button.setText(f"{arrow} {self.title}")
+
+    def set_title(self, title):
+        self.title = title
+        self.update_arrow()
         
     def add_widget(self, widget):
         self.content_layout.addWidget(widget)
 
+class InfoPanel(QWidget):
+    """Details of the selected venv; the widgets are built once and updated in place."""
+    copy_requested = pyqtSignal(str)
+    FIELDS = [("path", "Path"), ("python", "Python"), ("kind", "Type"), ("version", "Version"),
+              ("base", "Base interpreter"), ("creator", "Created by"), ("size", "Size")]
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        layout.setSpacing(4)
+        layout.setContentsMargins(0, 0, 0, 0)
+        self.placeholder = QLabel("Select a venv to see details.")
+        layout.addWidget(self.placeholder)
+
+        self.details = QWidget()
+        details_layout = QVBoxLayout(self.details)
+        details_layout.setSpacing(4)
+        details_layout.setContentsMargins(0, 0, 0, 0)
+        self.paths_section = CollapsibleSection("Paths")
+        self.labels = {}
+        for key, title in self.FIELDS:
+            label = QLabel()
+            self.labels[key] = (title, label)
+            self.paths_section.add_widget(label)
+        details_layout.addWidget(self.paths_section)
+
+        # Installed packages, read from dist-info metadata (pip is not run)
+        self.packages_section = CollapsibleSection("Packages")
+        self.packages_label = QLabel()
+        self.packages_section.add_widget(self.packages_label)
+        details_layout.addWidget(self.packages_section)
+
+        separator = QFrame()
+        separator.setFrameShape(QFrame.Shape.HLine)
+        separator.setObjectName("separator")
+        separator.setFixedHeight(1)
+        details_layout.addWidget(separator)
+
+        # Activation command with inline copy button
+        cmd_layout = QHBoxLayout()
+        cmd_layout.setSpacing(4)
+        self.cmd_text = QLabel()
+        self.activate_cmd = ""
+        cmd_copy_btn = QPushButton("Copy")
+        cmd_copy_btn.setFixedSize(45, 22)
+        cmd_copy_btn.clicked.connect(lambda: self.copy_requested.emit(self.activate_cmd))
+        cmd_layout.addWidget(self.cmd_text)
+        cmd_layout.addWidget(cmd_copy_btn)
+        cmd_layout.addStretch()
+        details_layout.addLayout(cmd_layout)
+        layout.addWidget(self.details)
+        self.details.hide()
+
+    def set_field(self, key, value):
+        title, label = self.labels[key]
+        label.setText(f"<b>{title}:</b> {html.escape(str(value or 'unknown'))}")
+
+    def show_empty(self):
+        self.details.hide()
+        self.placeholder.show()
+
+    def show_venv(self, path, meta, python_exe):
+        """Fill in what is known without touching the disk; the rest shows as loading."""
+        self.set_field("path", path)
+        self.set_field("python", python_exe)
+        for key in ("kind", "version", "base", "creator"):
+            self.set_field(key, meta.get(key))
+        self.set_field("size", "…")
+        self.packages_section.set_title("Packages (…)")
+        self.packages_label.setText("Loading…")
+        if os.name == "nt":
+            self.activate_cmd = f'"{path / "Scripts" / "activate.bat"}"'
+        else:
+            self.activate_cmd = f'source "{path / "bin" / "activate"}"'
+        self.cmd_text.setText(f"<span style='color: #4CAF50;'>{html.escape(self.activate_cmd)}</span>")
+        self.placeholder.hide()
+        self.details.show()
+
+    def show_details(self, details):
+        meta = details["meta"]
+        for key in ("kind", "version", "base", "creator"):
+            self.set_field(key, meta.get(key))
+        self.set_field("size", venvdu.format_size(details["size"]))
+        packages = details["packages"]
+        self.packages_section.set_title(f"Packages ({len(packages)})")
+        self.packages_label.setText("<br>".join(html.escape(f"{name} {version}") for name, version, files in packages)
+                                    or "No packages installed.")
+
+class InfoCache:
+    """Info panel details per venv; the least recently used entries are dropped first."""
+
+    def __init__(self, size=256):
+        self.size = size
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.size:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
+
+class InfoWorker(QObject):
+    """Reads the slower details of one venv (metadata, packages, size) for the info panel."""
+    done = pyqtSignal(str, dict)
+
+    def __init__(self, index, path):
+        super().__init__()
+        self.index = index
+        self.path = path
+        self.stop = threading.Event()
+
+    def run(self):
+        # Skipped if the selection moved on before this worker got a thread
+        if self.stop.is_set():
+            return
+        with venvtrace.span('info'):
+            meta = self.index.info(self.path) or venvmeta.metadata(self.path)
+            packages = venvpkgs.default_cache().get(self.path)
+            if self.stop.is_set():
+                return
+            size = venvdu.disk_usage(self.path)
+        self.done.emit(self.path, {"meta": meta, "packages": packages, "size": size})
+
+    def cancel(self):
+        self.stop.set()
+
+class ScanWorker(QObject):
+    """Walks the search roots through the index and streams venvs as they are found."""
+    found = pyqtSignal(str)
+    progress = pyqtSignal(int, int, str)  # roots done, total roots, current root
+    finished = pyqtSignal()
+
+    def __init__(self, index, roots):
+        super().__init__()
+        self.index = index
+        self.roots = roots
+        self.stop = threading.Event()
+
+    def run(self):
+        total = len(self.roots)
+        for done, root in enumerate(self.roots):
+            if self.stop.is_set():
+                break
+            self.progress.emit(done, total, root['path'])
+            if not os.path.isdir(root['path']):
+                continue
+            # Each root is walked to its own depth, with its globs and time budget
+            for venv in venvroots.iter_root(self.index, root, stop=self.stop):
+                self.found.emit(str(venv))
+        with venvtrace.span('save index'):
+            self.index.save()
+        self.finished.emit()
+
+    def cancel(self):
+        self.stop.set()
+
+class RefreshWorker(QObject):
+    """Re-checks one watched folder of a root through the index (only changed folders are listed)."""
+    done = pyqtSignal(str, list)  # path, venvs now at or below it
+
+    def __init__(self, index, root, path):
+        super().__init__()
+        self.index = index
+        self.root = root
+        self.path = path
+
+    def run(self):
+        with venvtrace.span('refresh', root=self.root['path']):
+            venvs = [str(v) for v in venvroots.iter_root(self.index, self.root, start=self.path)]
+            self.index.save()
+        self.done.emit(self.path, venvs)
+
+class VenvModel(QAbstractTableModel):
+    """Venv rows kept in flat arrays; metadata columns are looked up only for rows being drawn."""
+    COLUMNS = ["Path", "Type", "Python", "Size"]
+    PATH, KIND, VERSION, SIZE = range(4)
+    records_changed = pyqtSignal()  # the filter index changed
+
+    def __init__(self, venv_index, parent=None):
+        super().__init__(parent)
+        self.venv_index = venv_index
+        self.paths = []
+        self.sizes = array('q')  # bytes, -1 until known
+        self.rows = {}  # path -> row
+        self.usage = {}  # path -> venvstale.score(), once known
+        self.filter_index = venvfilter.FilterIndex()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.paths)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUMNS)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Horizontal and role == Qt.ItemDataRole.DisplayRole:
+            return self.COLUMNS[section]
+        return None
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+        if role == Qt.ItemDataRole.UserRole and column == self.SIZE:
+            return self.sizes[row]  # Sort key: bytes, not the formatted text
+        if role in (Qt.ItemDataRole.DisplayRole, Qt.ItemDataRole.UserRole):
+            path = self.paths[row]
+            if column == self.PATH:
+                return path
+            if column == self.SIZE:
+                return venvdu.format_size(self.sizes[row]) if self.sizes[row] >= 0 else ""
+            # Served from the in-memory index, no disk access
+            meta = self.venv_index.info(path) or {}
+            if column == self.VERSION:
+                return meta.get('version') or ""
+            badge = self.badge(path)
+            return f"{meta.get('kind') or ''} · {badge}" if badge else meta.get('kind') or ""
+        if role == Qt.ItemDataRole.TextAlignmentRole and column == self.SIZE:
+            return Qt.AlignmentFlag.AlignRight | Qt.AlignmentFlag.AlignVCenter
+        if column == self.KIND and role in (Qt.ItemDataRole.ForegroundRole, Qt.ItemDataRole.ToolTipRole):
+            usage = self.usage.get(self.paths[row])
+            if not usage or not usage['stale']:
+                return None
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor("#E57373" if usage['broken'] else "#FFB74D")
+            return usage['broken'] or f"Not used for {usage['idle_days']:.0f} days"
+        return None
+
+    def badge(self, path):
+        """"broken", "stale" or None for a venv."""
+        usage = self.usage.get(path)
+        if not usage or not usage['stale']:
+            return None
+        return "broken" if usage['broken'] else "stale"
+
+    def path(self, row):
+        return self.paths[row]
+
+    def add(self, paths):
+        """Append the paths not listed yet, as one insertion."""
+        new = [p for p in dict.fromkeys(paths) if p not in self.rows]
+        if not new:
+            return
+        for path in new:
+            self.filter_index.add(path, venvfilter.record(path, self.venv_index.info(path)))
+        first = len(self.paths)
+        self.beginInsertRows(QModelIndex(), first, first + len(new) - 1)
+        for path in new:
+            self.rows[path] = len(self.paths)
+            self.paths.append(path)
+            self.sizes.append(-1)
+        self.endInsertRows()
+        self.records_changed.emit()
+
+    def remove(self, paths):
+        """Drop the listed paths; rows are renumbered once for the whole batch."""
+        gone = sorted(self.rows.pop(p) for p in set(paths) if p in self.rows)
+        if not gone:
+            return
+        for row in gone:
+            self.filter_index.remove(self.paths[row])
+            self.usage.pop(self.paths[row], None)
+        # Runs of adjacent rows, each removed as one block
+        ranges = []
+        for row in gone:
+            if ranges and ranges[-1][1] == row - 1:
+                ranges[-1][1] = row
+            else:
+                ranges.append([row, row])
+        if len(ranges) > REMOVE_RANGES:
+            # Scattered rows: one reset is cheaper than a signal per block
+            self.beginResetModel()
+            dropped = set(gone)
+            keep = [i for i in range(len(self.paths)) if i not in dropped]
+            self.paths = [self.paths[i] for i in keep]
+            self.sizes = array('q', (self.sizes[i] for i in keep))
+            self.rows = {p: i for i, p in enumerate(self.paths)}
+            self.endResetModel()
+            return
+        for first, last in reversed(ranges):
+            self.beginRemoveRows(QModelIndex(), first, last)
+            del self.paths[first:last + 1]
+            del self.sizes[first:last + 1]
+            self.endRemoveRows()
+        self.rows = {p: i for i, p in enumerate(self.paths)}
+
+    def clear(self):
+        self.beginResetModel()
+        self.paths = []
+        self.sizes = array('q')
+        self.rows = {}
+        self.usage = {}
+        self.filter_index.clear()
+        self.endResetModel()
+
+    def set_size(self, path, size):
+        row = self.rows.get(path)
+        if row is not None:
+            self.sizes[row] = size
+            cell = self.index(row, self.SIZE)
+            self.dataChanged.emit(cell, cell)
+
+    def set_packages(self, path, names):
+        """Make a venv findable by its installed packages."""
+        if path in self.rows:
+            self.filter_index.update(path, pkg=[name.lower() for name in names])
+            self.records_changed.emit()
+
+    def set_usage(self, path, usage):
+        """Show a stale or broken badge; "stale" and "broken" can then be typed in the filter box."""
+        row = self.rows.get(path)
+        if row is None:
+            return
+        self.usage[path] = usage
+        kinds = [(self.venv_index.info(path) or {}).get('kind') or '']
+        if usage['stale']:
+            kinds.append('stale')  # Broken venvs count as stale too
+        if usage['broken']:
+            kinds.append('broken')
+        self.filter_index.update(path, kind=kinds)
+        cell = self.index(row, self.KIND)
+        self.dataChanged.emit(cell, cell)
+        self.records_changed.emit()
+
+    def unsized(self):
+        return [p for p, size in zip(self.paths, self.sizes) if size < 0]
+
+class VenvFilterProxy(QSortFilterProxyModel):
+    """Sorts venv rows and hides those not matching the query, using the model's FilterIndex."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.query = ""
+        self.hits = None  # matching paths, None when not filtering
+
+    def set_query(self, query):
+        self.query = query.strip()
+        self.refilter()
+
+    def refilter(self):
+        self.hits = self.sourceModel().filter_index.search(self.query) if self.query else None
+        self.invalidateFilter()
+
+    def filterAcceptsRow(self, row, parent):
+        return self.hits is None or self.sourceModel().paths[row] in self.hits
+
+class SizeWorker(QObject):
+    """Scores how stale each venv is, then computes disk usage (hardlinks once, cached per
+    directory mtime) and package names for each one."""
+    scored = pyqtSignal(str, dict)
+    sized = pyqtSignal(str, 'qint64')
+    packaged = pyqtSignal(str, list)
+    finished = pyqtSignal()
+
+    def __init__(self, index, paths):
+        super().__init__()
+        self.index = index
+        self.paths = paths
+        self.stop = threading.Event()
+
+    def run(self):
+        # A few stats per venv, so every row has its badge long before sizing is done
+        for usage in venvstale.score_all(self.index, self.paths):
+            if self.stop.is_set():
+                break
+            self.scored.emit(usage['path'], usage)
+        with venvtrace.span('size'), ThreadPoolExecutor(max_workers=venvscan.default_workers()) as pool:
+            for path in self.paths:
+                if self.stop.is_set():
+                    break
+                self.sized.emit(path, venvdu.disk_usage(path, pool))
+                # For filtering by package; read from dist-info, cached per site-packages mtime
+                self.packaged.emit(path, [p[0] for p in venvpkgs.default_cache().get(path)])
+        venvpkgs.default_cache().save()
+        self.finished.emit()
+
+    def cancel(self):
+        self.stop.set()
+
+class ProbeWorker(QObject):
+    """Probes interpreter versions concurrently and emits each one as it completes."""
+    found = pyqtSignal(str, str)  # version label, executable
+    finished = pyqtSignal()
+
+    def __init__(self, candidates):
+        super().__init__()
+        self.candidates = candidates
+        self.stop = threading.Event()
+
+    def run(self):
+        with venvtrace.span('probe'):
+            for path, info in interpreters.probe_all(self.candidates, stop=self.stop):
+                if info:
+                    self.found.emit(f"Python {info['version']}", path)
+        interpreters.default_cache().save()
+        self.finished.emit()
+
+    def cancel(self):
+        self.stop.set()
+
+class Job(QObject):
+    """A create, delete or batch task run on the job pool; subclasses implement work()."""
+    progress = pyqtSignal(str, int)  # message, percent (-1 while unknown)
+    finished = pyqtSignal(bool, str)  # succeeded, message
+
+    def __init__(self, title):
+        super().__init__()
+        self.title = title
+        self.stop = threading.Event()
+
+    def run(self):
+        from venvtemplate import Cancelled
+        try:
+            message = self.work()
+        except Cancelled:
+            self.finished.emit(False, "Cancelled")
+        except Exception as e:
+            self.finished.emit(False, str(e))
+        else:
+            self.finished.emit(True, message)
+
+    def cancel(self):
+        self.stop.set()
+
+class CreateJob(Job):
+    def __init__(self, venv_path, python_path):
+        super().__init__(f"Create {venv_path}")
+        self.venv_path = venv_path
+        self.python_path = python_path
+
+    def work(self):
+        # Cloned from a warm per-interpreter template when possible
+        import venvtemplate
+        venvtemplate.create(self.venv_path, self.python_path, stop=self.stop,
+                            progress=lambda message: self.progress.emit(message, -1))
+        return f"Venv '{self.venv_path.name}' created"
+
+class DeleteJob(Job):
+    """Purges venvs that were already renamed into the trash, one after the other on one pool."""
+
+    def __init__(self, entries):
+        super().__init__(f"Delete {entries[0]['original']}" if len(entries) == 1 else f"Delete {len(entries)} venvs")
+        self.entries = entries
+
+    def work(self):
+        self.progress.emit("Deleting", -1)
+        import venvtrash
+        total = len(self.entries)
+        with ThreadPoolExecutor(max_workers=venvscan.default_workers(2, 16)) as pool:
+            for done, entry in enumerate(self.entries):
+                status = "Deleting" if total == 1 else f"Deleting {done + 1}/{total}"
+                venvtrash.purge(entry, pool, stop=self.stop,
+                                progress=lambda percent: self.progress.emit(status, (done * 100 + percent) // total))
+        return "Virtual environment deleted" if total == 1 else f"{total} virtual environments deleted"
+
+class BatchJob(Job):
+    """Runs action(venv, stop) for several venvs at once on one shared pool (see venvbatch.run)."""
+
+    def __init__(self, title, verb, action, venvs):
+        super().__init__(title)
+        self.verb = verb
+        self.action = action
+        self.venvs = venvs
+        self.results = {}
+
+    def work(self):
+        import venvbatch
+        total = len(self.venvs)
+        errors = []
+        self.progress.emit(f"0/{total}", 0)
+        batch = venvbatch.run(lambda venv: self.action(venv, self.stop), self.venvs, stop=self.stop)
+        for done, (venv, result, error) in enumerate(batch, 1):
+            if error is None:
+                self.results[venv] = result
+            else:
+                errors.append((venv, error))
+            failed = f", {len(errors)} failed" if errors else ""
+            self.progress.emit(f"{done}/{total}{failed}", done * 100 // total)
+        if self.stop.is_set():
+            raise venvbatch.Cancelled()
+        message = self.summary()
+        if errors:
+            venv, error = errors[0]
+            raise RuntimeError(f"{len(errors)} of {total} failed; {Path(venv).name}: {error}")
+        return message
+
+    def summary(self):
+        return f"{len(self.results)} venvs {self.verb}"
+
+class PackagesJob(BatchJob):
+    """Writes the package inventories of several venvs to one CSV file."""
+
+    def __init__(self, venvs, path):
+        cache = venvpkgs.default_cache()
+        super().__init__(f"Export packages of {len(venvs)} venvs", "exported",
+                         lambda venv, stop: cache.get(venv), venvs)
+        self.path = path
+
+    def summary(self):
+        import csv
+        venvpkgs.default_cache().save()
+        with open(self.path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(['venv', 'name', 'version', 'files'])
+            for venv in self.venvs:
+                for name, version, files in self.results.get(venv, []):
+                    writer.writerow([venv, name, version, files])
+        return f"Packages of {len(self.results)} venvs saved to {Path(self.path).name}"
+
+class JobRunner(QRunnable):
+    """Runs job.run() on a QThreadPool thread."""
+
+    def __init__(self, job):
+        super().__init__()
+        self.job = job
+
+    def run(self):
+        self.job.run()
+
+class JobRow(QFrame):
+    """One job in the jobs panel: title, status, progress bar and cancel button."""
+
+    def __init__(self, job, parent=None):
+        super().__init__(parent)
+        self.job = job
+        layout = QHBoxLayout(self)
+        layout.setContentsMargins(4, 2, 4, 2)
+        layout.setSpacing(6)
+        self.title = QLabel(job.title)
+        self.status = QLabel("Queued")
+        self.bar = QProgressBar()
+        self.bar.setFixedWidth(120)
+        self.bar.setFixedHeight(10)
+        self.bar.setTextVisible(False)
+        self.bar.setRange(0, 0)
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.setFixedSize(55, 22)
+        self.cancel_btn.clicked.connect(job.cancel)
+        layout.addWidget(self.title, 1)
+        layout.addWidget(self.status)
+        layout.addWidget(self.bar)
+        layout.addWidget(self.cancel_btn)
+        job.progress.connect(self.on_progress)
+        job.finished.connect(self.on_finished)
+
+    def on_progress(self, message, percent):
+        self.status.setText(message)
+        if percent < 0:
+            self.bar.setRange(0, 0)  # Busy indicator
+        else:
+            self.bar.setRange(0, 100)
+            self.bar.setValue(percent)
+
+    def on_finished(self, ok, message):
+        self.bar.hide()
+        self.cancel_btn.hide()
+        self.status.setText(message)
+        if not ok:
+            self.status.setStyleSheet("color: #E57373;")
+        # Successful jobs disappear after a moment, failures stay a bit longer
+        QTimer.singleShot(4000 if ok else 15000, self.deleteLater)
+
+class JobsPanel(QFrame):
+    """Lists running and recently finished jobs; hidden while there are none."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.layout = QVBoxLayout(self)
+        self.layout.setContentsMargins(0, 0, 0, 0)
+        self.layout.setSpacing(2)
+        self.hide()
+
+    def add_job(self, job):
+        row = JobRow(job)
+        row.destroyed.connect(self.update_visibility)
+        self.layout.addWidget(row)
+        self.show()
+        return row
+
+    def update_visibility(self):
+        # Runs from the row's destroyed signal, before the layout has dropped it
+        QTimer.singleShot(0, lambda: self.setVisible(self.layout.count() > 0))
+
+class DiagnosticsDialog(QDialog):
+    """Directory listings, stats, spawns and time per phase and search root, as traced since startup."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setWindowTitle("Diagnostics")
+        self.resize(720, 360)
+        layout = QVBoxLayout(self)
+        self.text = QPlainTextEdit()
+        self.text.setObjectName("trace")
+        self.text.setReadOnly(True)
+        self.text.setLineWrapMode(QPlainTextEdit.LineWrapMode.NoWrap)
+        layout.addWidget(self.text)
+
+        button_layout = QHBoxLayout()
+        refresh_btn = ModernButton("Refresh")
+        reset_btn = ModernButton("Reset")
+        save_btn = ModernButton("Save Chrome Trace")
+        close_btn = ModernButton("Close")
+        refresh_btn.clicked.connect(self.refresh)
+        reset_btn.clicked.connect(self.reset)
+        save_btn.clicked.connect(self.save_trace)
+        close_btn.clicked.connect(self.accept)
+        for button in (refresh_btn, reset_btn, save_btn):
+            button_layout.addWidget(button)
+        button_layout.addStretch()
+        button_layout.addWidget(close_btn)
+        layout.addLayout(button_layout)
+        self.refresh()
+
+    def refresh(self):
+        if not venvtrace.enabled():
+            self.text.setPlainText("Tracing is off.")
+            return
+        self.text.setPlainText(venvtrace.format_table())
+
+    def reset(self):
+        venvtrace.reset()
+        self.refresh()
+
+    def save_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Save Chrome Trace", "venvy-trace.json", "JSON (*.json)")
+        if not path:
+            return
+        try:
+            venvtrace.write_chrome_trace(path)
+        except OSError as e:
+            QMessageBox.critical(self, "Error", f"Failed to save the trace:\n{e}")
+
 class VenvManager(QWidget):
     def __init__(self):
         super().__init__()
         self.setWindowTitle("Venvy")
         self.setGeometry(100, 100, 700, 500)  # Smaller window size
-        self.setStyleSheet("""
-            QWidget {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-            }
-            QListWidget {
-                background-color: #2D2D2D;
-                border: 1px solid #3D3D3D;
-                border-radius: 4px;
-                padding: 4px;
-                font-size: 13px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #3D3D3D;
-            }
-            QListWidget::item:selected {
-                background-color: #2E7D32;
-                color: white;
-            }
-            QLabel {
-                font-size: 13px;
-                color: #B0B0B0;
-            }
-            QMenu {
-                background-color: #2D2D2D;
-                border: 1px solid #3D3D3D;
-                color: #E0E0E0;
-            }
-            QMenu::item {
-                padding: 5px 20px;
-            }
-            QMenu::item:selected {
-                background-color: #2E7D32;
-            }
-        """)
 
         # Main layout
         main_layout = QVBoxLayout()
@@ -138,97 +894,102 @@ class VenvManager(QWidget):
 
         # Title
         title = QLabel("Venvy")
-        title.setStyleSheet("""
-            QLabel {
-                font-size: 20px;
-                font-weight: bold;
-                color: #4CAF50;
-                padding: 8px;
-            }
-        """)
+        title.setObjectName("title")
         title.setAlignment(Qt.AlignmentFlag.AlignCenter)
         main_layout.addWidget(title)
 
         # List widget with scroll area
         scroll = QScrollArea()
         scroll.setWidgetResizable(True)
-        scroll.setStyleSheet("""
-            QScrollArea {
-                border: none;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #1E1E1E;
-                width: 8px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #4CAF50;
-                min-height: 20px;
-                border-radius: 4px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-        """)
-
-        self.venv_list = QListWidget()
+
+        # Rows live in a flat model; the view only asks for the rows on screen.
+        # Click a header to sort (done by the proxy, which also filters)
+        self.index = VenvIndex()
+        mark_startup("index loaded")
+        self.venv_model = VenvModel(self.index, self)
+        self.venv_proxy = VenvFilterProxy(self)
+        self.venv_proxy.setSourceModel(self.venv_model)
+        self.venv_proxy.setSortRole(Qt.ItemDataRole.UserRole)
+
+        # Filter box: every keystroke is answered from the filter index, never a rescan
+        self.filter_input = QLineEdit()
+        self.filter_input.setPlaceholderText("Filter: name, path, py:3.12, pkg:django, ~fuzzy")
+        self.filter_input.setClearButtonEnabled(True)
+        self.filter_input.setObjectName("filter")
+        self.filter_input.textChanged.connect(self.venv_proxy.set_query)
+        main_layout.addWidget(self.filter_input)
+        # New rows and package names are matched against the query shortly after they arrive
+        self.refilter_timer = QTimer(self)
+        self.refilter_timer.setSingleShot(True)
+        self.refilter_timer.setInterval(150)
+        self.refilter_timer.timeout.connect(self.venv_proxy.refilter)
+        self.venv_model.records_changed.connect(self.schedule_refilter)
+        self.venv_list = QTableView()
+        self.venv_list.setModel(self.venv_proxy)
+        self.venv_list.setSelectionBehavior(QTableView.SelectionBehavior.SelectRows)
+        self.venv_list.setSelectionMode(QTableView.SelectionMode.ExtendedSelection)
+        self.venv_list.setShowGrid(False)
+        self.venv_list.setWordWrap(False)
+        # Fixed row height: no per-row size hints are computed
+        self.venv_list.verticalHeader().hide()
+        self.venv_list.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.venv_list.verticalHeader().setDefaultSectionSize(36)
         self.venv_list.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.venv_list.customContextMenuRequested.connect(self.show_context_menu)
-        self.venv_list.setStyleSheet("""
-            QListWidget {
-                background-color: #2D2D2D;
-                border: 1px solid #3D3D3D;
-                border-radius: 4px;
-                padding: 4px;
-            }
-            QListWidget::item {
-                padding: 8px;
-                border-bottom: 1px solid #3D3D3D;
-            }
-            QListWidget::item:selected {
-                background-color: #2E7D32;
-                color: white;
-            }
-        """)
+        self.venv_list.setSortingEnabled(True)
+        self.venv_list.sortByColumn(0, Qt.SortOrder.AscendingOrder)
+        header = self.venv_list.horizontalHeader()
+        header.setStretchLastSection(False)
+        header.setSectionResizeMode(VenvModel.PATH, QHeaderView.ResizeMode.Stretch)
+        for column, width in ((VenvModel.KIND, 140), (VenvModel.VERSION, 80), (VenvModel.SIZE, 90)):
+            header.resizeSection(column, width)
         scroll.setWidget(self.venv_list)
         main_layout.addWidget(scroll)
 
+        # Scan status with cancel button, only visible while scanning
+        status_layout = QHBoxLayout()
+        status_layout.setSpacing(8)
+        self.scan_status = QLabel("")
+        self.cancel_scan_btn = ModernButton("Cancel Scan")
+        self.cancel_scan_btn.clicked.connect(self.cancel_scan)
+        self.cancel_scan_btn.hide()
+        status_layout.addWidget(self.scan_status)
+        status_layout.addStretch()
+        status_layout.addWidget(self.cancel_scan_btn)
+        main_layout.addLayout(status_layout)
+
         # Info label with frame
         info_frame = QFrame()
-        info_frame.setStyleSheet("""
-            QFrame {
-                background-color: #2D2D2D;
-                border: 1px solid #3D3D3D;
-                border-radius: 4px;
-                padding: 6px;
-            }
-            QPushButton {
-                background-color: #4CAF50;
-                color: white;
-                border: none;
-                border-radius: 2px;
-                padding: 2px 5px;
-                font-size: 11px;
-            }
-            QPushButton:hover {
-                background-color: #388E3C;
-            }
-            QPushButton:pressed {
-                background-color: #2E7D32;
-            }
-            QLabel {
-                color: #B0B0B0;
-                font-size: 12px;
-            }
-        """)
+        info_frame.setObjectName("info")
         self.info_layout = QVBoxLayout(info_frame)
         self.info_layout.setSpacing(4)  # Reduced spacing between elements
         self.info_layout.setContentsMargins(6, 6, 6, 6)  # Reduced margins
-        self.info_label = QLabel("Select a venv to see details.")
-        self.info_layout.addWidget(self.info_label)
+        self.info_panel = InfoPanel()
+        self.info_panel.copy_requested.connect(self.copy_to_clipboard)
+        self.info_layout.addWidget(self.info_panel)
+        self.info_cache = InfoCache()
+        self.info_worker = None
         main_layout.addWidget(info_frame)
 
+        # Background create/delete jobs
+        self.jobs_panel = JobsPanel()
+        main_layout.addWidget(self.jobs_panel)
+        self.job_pool = QThreadPool(self)
+        self.job_pool.setMaxThreadCount(4)
+        self.jobs = set()
+
+        # Watch the search roots and their subfolders; changes are applied as diffs
+        self.watcher = QFileSystemWatcher(self)
+        self.watcher.directoryChanged.connect(self.directory_changed)
+        self.watch_roots = {}  # watched path -> search root it belongs to
+        self.watch_overflow = False
+        self.dirty_paths = set()
+        self.refreshers = set()
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.setSingleShot(True)
+        self.refresh_timer.setInterval(300)
+        self.refresh_timer.timeout.connect(self.apply_changes)
+
         # Buttons
         btn_layout = QHBoxLayout()
         btn_layout.setSpacing(8)  # Reduced spacing between buttons
@@ -236,95 +997,298 @@ class VenvManager(QWidget):
         self.open_terminal_btn = ModernButton("Open Terminal")
         self.new_btn = ModernButton("Create New Venv")
         self.browse_btn = ModernButton("Browse Folder")
+        self.diagnostics_btn = ModernButton("Diagnostics")
 
         self.open_terminal_btn.clicked.connect(self.open_terminal)
         self.new_btn.clicked.connect(self.create_venv)
         self.browse_btn.clicked.connect(self.browse_folder)
-        self.venv_list.currentItemChanged.connect(self.update_info)
+        self.diagnostics_btn.clicked.connect(self.show_diagnostics)
+        self.venv_list.selectionModel().currentRowChanged.connect(self.update_info)
 
         btn_layout.addWidget(self.new_btn)
         btn_layout.addWidget(self.open_terminal_btn)
         btn_layout.addWidget(self.browse_btn)
+        btn_layout.addWidget(self.diagnostics_btn)
         main_layout.addLayout(btn_layout)
 
         self.setLayout(main_layout)
         self.base_path = str(Path.home())
-        self.load_venvs()
+        self.scan_thread = None
+        self.scan_worker = None
+        # Venvs found by the scan are added to the model in batches
+        self.pending_venvs = []
+        self.add_timer = QTimer(self)
+        self.add_timer.setSingleShot(True)
+        self.add_timer.setInterval(100)
+        self.add_timer.timeout.connect(self.flush_venvs)
+        self.size_worker = None
+        self.probe_thread = None
+        self.probe_worker = None
+        self.version_combo = None
+        self.unconfirmed = set()
+        self.scan_found = set()
+        self.closing = False
+        mark_startup("widgets built")
+
+        # List what the index already knows right away; the scan, started once
+        # the window is up, confirms it and adds the rest
+        self.roots = venvroots.load_roots()
+        self.venv_model.add(venvroots.cached_venvs(self.index, self.roots))
+        mark_startup("cached venvs listed")
+        QTimer.singleShot(0, self.load_venvs)
 
     def load_venvs(self):
-        self.venv_list.clear()
-        # Common locations to search for virtual environments
-        search_paths = [
-            Path.home(),  # User's home directory
-            Path.home() / ".virtualenvs",  # virtualenvwrapper default
-            Path.home() / "venvs",  # Common venv directory
-            Path.home() / "virtualenvs",  # Another common venv directory
-            Path.home() / "envs",  # Another common venv directory
-            Path.home() / ".venv",  # Common project-level venv
-            Path.home() / "Documents" / "Python" / "venvs",  # Common Windows location
-            Path.home() / "Documents" / "Python" / "virtualenvs",  # Another Windows location
-            Path(os.getcwd()),  # Current working directory
-        ]
-
-        # Add any custom paths from environment variables
-        if "WORKON_HOME" in os.environ:
-            search_paths.append(Path(os.environ["WORKON_HOME"]))
-        if "VIRTUALENVWRAPPER_HOOK_DIR" in os.environ:
-            search_paths.append(Path(os.environ["VIRTUALENVWRAPPER_HOOK_DIR"]))
-        if "VIRTUAL_ENV" in os.environ:
-            search_paths.append(Path(os.environ["VIRTUAL_ENV"]).parent)
-
-        # Keep track of found venvs to avoid duplicates
-        found_venvs = set()
-
-        # Scan all paths for virtual environments
-        for base_path in search_paths:
-            if not base_path.exists():
+        """Start a background scan; venvs are added to the list as they are found."""
+        self.cancel_scan()
+        self.cancel_sizing()
+        self.pending_venvs = []
+        # Rows already listed stay; those the scan does not find again are removed when it ends
+        self.unconfirmed = set(self.venv_model.rows)
+        self.scan_found = set()
+        self.roots = venvroots.load_roots()
+
+        thread = QThread(self)
+        worker = ScanWorker(self.index, self.roots)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        # Bound methods (not lambdas) so the slots run queued on the GUI thread
+        worker.found.connect(self.add_venv)
+        worker.progress.connect(self.show_scan_progress)
+        worker.finished.connect(self.scan_finished)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+
+        self.scan_thread = thread
+        self.scan_worker = worker
+        self.cancel_scan_btn.show()
+        thread.start()
+
+    def add_venv(self, venv_path):
+        # Ignore late results from a scan that has been replaced
+        if self.sender() is not self.scan_worker:
+            return
+        self.scan_found.add(venv_path)
+        self.pending_venvs.append(venv_path)
+        if not self.add_timer.isActive():
+            self.add_timer.start()
+
+    def flush_venvs(self):
+        pending, self.pending_venvs = self.pending_venvs, []
+        self.venv_model.add(pending)
+
+    def current_venv(self):
+        """Path of the selected venv, or None."""
+        index = self.venv_list.currentIndex()
+        if not index.isValid():
+            return None
+        return self.venv_model.path(self.venv_proxy.mapToSource(index).row())
+
+    def selected_venvs(self):
+        """Paths of all selected venvs, in display order."""
+        rows = sorted(self.venv_list.selectionModel().selectedRows(), key=lambda index: index.row())
+        return [self.venv_model.path(self.venv_proxy.mapToSource(index).row()) for index in rows]
+
+    def show_scan_progress(self, done, total, root):
+        if self.sender() is self.scan_worker:
+            self.scan_status.setText(f"Scanning {done + 1}/{total}: {root} ({len(self.scan_found)} found)")
+
+    def scan_finished(self):
+        if self.sender() is not self.scan_worker:
+            return
+        cancelled = self.scan_worker.stop.is_set()
+        self.scan_worker = None
+        self.scan_thread = None
+        self.cancel_scan_btn.hide()
+        self.add_timer.stop()
+        self.flush_venvs()
+        if not cancelled:
+            gone = self.unconfirmed - self.scan_found
+            self.venv_model.remove(gone)
+            for venv in gone:
+                self.info_cache.discard(venv)
+        self.unconfirmed = set()
+        state = "Scan cancelled" if cancelled else "Scan complete"
+        self.scan_status.setText(f"{state}: {len(self.venv_model.rows)} venvs")
+        self.start_sizing()
+        self.watch_search_roots()
+
+    def watch_levels(self, root):
+        """How many levels below a root are watched.
+
+        A venv appearing at the root's full depth changes the folder one level
+        up, so that is deep enough. Roots without a depth limit only get their
+        first level watched; venvs appearing deeper down show up on the next
+        scan.
+        """
+        if root['depth'] is None:
+            return 1
+        return min(root['depth'], max(root['depth'] - 1, 1))
+
+    def wants_watch(self, path):
+        """The root a folder is watched for, or None if it is not watched."""
+        root = venvroots.owner(self.roots, path)
+        if root is None or venvroots.relative_depth(root, path) > self.watch_levels(root):
+            return None
+        return root
+
+    def watch_search_roots(self):
+        """Watch every search root and its subfolders down to watch_levels(), each for the root seeing it deepest."""
+        if self.watcher.directories():
+            self.watcher.removePaths(self.watcher.directories())
+        self.watch_roots = {}
+        for root in self.roots:
+            if not os.path.isdir(root['path']):
                 continue
-            try:
-                # First check if the base path itself is a venv
-                if self.is_venv(base_path):
-                    venv_path = str(base_path)
-                    if venv_path not in found_venvs:
-                        self.venv_list.addItem(venv_path)
-                        found_venvs.add(venv_path)
-                
-                # Then check immediate subdirectories
-                for folder in base_path.iterdir():
-                    if folder.is_dir() and self.is_venv(folder):
-                        venv_path = str(folder)
-                        if venv_path not in found_venvs:
-                            self.venv_list.addItem(venv_path)
-                            found_venvs.add(venv_path)
-            except PermissionError:
-                continue  # Skip directories we can't access
-
-        # Sort the list alphabetically
-        self.venv_list.sortItems()
+            level = [root['path']]
+            for _ in range(self.watch_levels(root) + 1):
+                for path in level:
+                    owner = self.wants_watch(path)
+                    if owner is not None:
+                        self.watch_roots[path] = owner
+                level = [sub for path in level for sub in self.index.subdirs(path)]
+        paths = list(self.watch_roots)
+        failed = self.watcher.addPaths(paths) if paths else []
+        # Out of watches (e.g. the inotify limit): changes trigger a full rescan instead
+        self.watch_overflow = bool(failed)
+
+    def directory_changed(self, path):
+        # Coalesce bursts of events into one refresh
+        self.dirty_paths.add(path)
+        self.refresh_timer.start()
+
+    def apply_changes(self):
+        dirty, self.dirty_paths = self.dirty_paths, set()
+        if self.watch_overflow:
+            self.load_venvs()
+            return
+        for path in dirty:
+            if path in self.watch_roots:
+                self.refresh_path(self.watch_roots[path], path)
+
+    def refresh_path(self, root, path):
+        """Re-check path within root in the background and apply the difference to the list."""
+        worker = RefreshWorker(self.index, root, path)
+        worker.done.connect(self.refresh_done)
+        self.refreshers.add(worker)
+        QThreadPool.globalInstance().start(JobRunner(worker))
+
+    def refresh_done(self, path, venvs):
+        worker = self.sender()
+        self.refreshers.discard(worker)
+        now = set(venvs)
+        # Venvs previously found at this spot that are gone now
+        prefix = path.rstrip(os.sep) + os.sep
+        here = [v for v in self.venv_model.rows if v == path or v.startswith(prefix)]
+        for venv in here:
+            # Something changed here, so cached details may be stale
+            self.info_cache.discard(venv)
+        # Only venvs this root could have found count as gone; deeper ones belong to other roots
+        self.venv_model.remove(v for v in here if v not in now and venvroots.in_root(v, worker.root))
+        self.venv_model.add(venvs)
+        current = self.current_venv()
+        if current and (current == path or current.startswith(prefix)):
+            self.update_info()
+        if path in self.watch_roots:
+            # Watch subfolders that appeared since the last refresh
+            new = {}
+            for sub in self.index.subdirs(path):
+                owner = self.wants_watch(sub) if sub not in self.watch_roots else None
+                if owner is not None:
+                    new[sub] = owner
+            self.watch_roots.update(new)
+            if new and self.watcher.addPaths(list(new)):
+                self.watch_overflow = True
+        self.start_sizing()
+
+    def start_sizing(self):
+        """Compute sizes of listed venvs that have none yet, in the background."""
+        self.cancel_sizing()
+        if self.closing:
+            return
+        paths = sorted(self.venv_model.unsized())
+        if not paths:
+            return
+        thread = QThread(self)
+        worker = SizeWorker(self.index, paths)
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.sized.connect(self.set_venv_size)
+        worker.packaged.connect(self.set_venv_packages)
+        worker.scored.connect(self.set_venv_usage)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+        self.size_worker = worker
+        thread.start()
+
+    def set_venv_size(self, venv_path, size):
+        if self.sender() is self.size_worker:
+            self.venv_model.set_size(venv_path, size)
+
+    def set_venv_usage(self, venv_path, usage):
+        if self.sender() is self.size_worker:
+            self.venv_model.set_usage(venv_path, usage)
+
+    def set_venv_packages(self, venv_path, names):
+        if self.sender() is self.size_worker:
+            self.venv_model.set_packages(venv_path, names)
+
+    def schedule_refilter(self):
+        if self.venv_proxy.query and not self.refilter_timer.isActive():
+            self.refilter_timer.start()
+
+    def cancel_sizing(self):
+        if self.size_worker is not None:
+            self.size_worker.cancel()
+        self.size_worker = None
+
+    def cancel_scan(self):
+        if self.scan_worker is not None:
+            self.scan_worker.cancel()
+
+    def submit_job(self, job):
+        """Run a create, delete or batch job in the background and show it in the jobs panel."""
+        self.jobs.add(job)
+        self.jobs_panel.add_job(job)
+        job.finished.connect(self.job_finished)
+        self.job_pool.start(JobRunner(job))
+
+    def job_finished(self, ok, message):
+        job = self.sender()
+        self.jobs.discard(job)
+        if ok and isinstance(job, CreateJob):
+            # Only the new venv is checked; the rest of the list stays as it is
+            path = str(Path(job.venv_path).absolute())
+            self.refresh_path(venvroots.make_root(path, depth=0), path)
+        elif isinstance(job, BatchJob) and not isinstance(job, PackagesJob):
+            # Some venvs may have changed even if others failed
+            for path in job.venvs:
+                self.refresh_path(venvroots.make_root(path, depth=0), path)
+
+    def closeEvent(self, event):
+        # Signals still queued from workers must not start new work
+        self.closing = True
+        for job in list(self.jobs):
+            job.cancel()
+        self.job_pool.waitForDone()
+        if self.info_worker is not None:
+            self.info_worker.cancel()
+        self.refresh_timer.stop()
+        # Folder refreshes and info reads run on the global pool
+        QThreadPool.globalInstance().waitForDone()
+        self.cancel_sizing()
+        self.cancel_scan()
+        self.scan_worker = None
+        # Workers replaced by a rescan may still be running; their threads only quit
+        # once the event loop handles it, which will not happen after closing
+        for thread in self.findChildren(QThread):
+            thread.quit()
+            thread.wait()
+        venvpkgs.default_cache().save()
+        super().closeEvent(event)
 
     def is_venv(self, path: Path):
-        """Check if the given path is a Python virtual environment."""
-        if not path.is_dir():
-            return False
-            
-        # Check for common virtual environment indicators
-        venv_indicators = [
-            # Standard venv and virtualenv
-            ["Scripts", "activate.bat"],  # Windows
-            ["Scripts", "python.exe"],    # Windows
-            ["bin", "activate"],          # Unix
-            ["bin", "python"],            # Unix
-            ["pyvenv.cfg"],               # venv config file
-            # Conda environments
-            ["conda-meta"],
-            ["etc", "conda"]
-        ]
-        
-        for indicator in venv_indicators:
-            if (path / Path(*indicator)).exists():
-                return True
-                
-        return False
+        """Return the environment kind (venv, virtualenv, conda, pyenv) or None."""
+        return venvdetect.detect(path)
 
     def copy_to_clipboard(self, text):
         clipboard = QApplication.clipboard()
@@ -333,56 +1297,35 @@ class VenvManager(QWidget):
         QToolTip.showText(QCursor.pos(), "Copied to clipboard!", self, QRect(), 1000)
 
     def update_info(self):
-        item = self.venv_list.currentItem()
-        if item:
-            path = Path(item.text())
-            python_exe = path / ("Scripts/python.exe" if os.name == "nt" else "bin/python")
-            
-            # Get activation command
-            if os.name == "nt":  # Windows
-                activate_cmd = f'"{path / "Scripts" / "activate.bat"}"'
-            else:  # Unix-like systems
-                activate_cmd = f'source "{path / "bin" / "activate"}"'
-            
-            # Clear previous widgets
-            for i in reversed(range(self.info_layout.count())): 
-                self.info_layout.itemAt(i).widget().setParent(None)
-            
-            # Create collapsible section for paths
-            paths_section = CollapsibleSection("Paths")
-            path_label = QLabel(f"<b>Path:</b> {path}")
-            python_label = QLabel(f"<b>Python:</b> {python_exe}")
-            paths_section.add_widget(path_label)
-            paths_section.add_widget(python_label)
-            self.info_layout.addWidget(paths_section)
-            
-            # Add separator
-            separator = QFrame()
-            separator.setFrameShape(QFrame.Shape.HLine)
-            separator.setStyleSheet("background-color: #3D3D3D;")
-            separator.setFixedHeight(1)
-            self.info_layout.addWidget(separator)
-            
-            # Command layout with inline copy button
-            cmd_layout = QHBoxLayout()
-            cmd_layout.setSpacing(4)  # Reduced spacing
-            
-            cmd_text = QLabel(f"<span style='color: #4CAF50;'>{activate_cmd}</span>")
-            
-            cmd_copy_btn = QPushButton("Copy")
-            cmd_copy_btn.setFixedSize(45, 22)  # Even smaller button
-            cmd_copy_btn.clicked.connect(lambda: self.copy_to_clipboard(activate_cmd))
-            
-            cmd_layout.addWidget(cmd_text)
-            cmd_layout.addWidget(cmd_copy_btn)
-            cmd_layout.addStretch()
-            self.info_layout.addLayout(cmd_layout)
-        else:
-            self.info_label.setText("Select a venv to see details.")
+        """Show the selected venv; cheap fields at once, the rest from the cache or a background read."""
+        venv = self.current_venv()
+        if self.info_worker is not None:
+            self.info_worker.cancel()
+            self.info_worker = None
+        if not venv:
+            self.info_panel.show_empty()
+            return
+        path = Path(venv)
+        meta = self.index.info(path) or {}
+        self.info_panel.show_venv(path, meta, venvdetect.python_path(path, meta.get("kind")))
+        details = self.info_cache.get(venv)
+        if details is not None:
+            self.info_panel.show_details(details)
+            return
+        worker = InfoWorker(self.index, venv)
+        worker.done.connect(self.info_ready)
+        self.info_worker = worker
+        QThreadPool.globalInstance().start(JobRunner(worker))
 
-    def find_python_versions(self):
-        """Find available Python versions on the system."""
-        versions = []
+    def info_ready(self, venv, details):
+        self.info_cache.put(venv, details)
+        if self.sender() is self.info_worker:
+            self.info_worker = None
+            self.info_panel.show_details(details)
+
+    def find_python_candidates(self):
+        """Find Python executables on the system without running them."""
+        candidates = []
         if os.name == "nt":  # Windows
             # Check common Windows Python installation locations
             common_paths = [
@@ -412,13 +1355,7 @@ class VenvManager(QWidget):
                         if os.path.isdir(full_path) and fnmatch.fnmatch(item, pattern):
                             python_exe = os.path.join(full_path, "python.exe")
                             if os.path.exists(python_exe):
-                                try:
-                                    result = subprocess.run([python_exe, "--version"], 
-                                                          capture_output=True, text=True)
-                                    version = result.stdout.strip()
-                                    versions.append((version, python_exe))
-                                except:
-                                    continue
+                                candidates.append(python_exe)
                 except Exception as e:
                     print(f"Error checking path {path_pattern}: {e}")
                     continue
@@ -431,72 +1368,67 @@ class VenvManager(QWidget):
             ]
             
             for path_pattern in common_paths:
-                try:
-                    dir_path = os.path.dirname(path_pattern)
-                    pattern = os.path.basename(path_pattern)
-                    
-                    if not os.path.exists(dir_path):
-                        continue
-                        
-                    for item in os.listdir(dir_path):
-                        full_path = os.path.join(dir_path, item)
-                        if os.path.isfile(full_path) and not os.path.islink(full_path) and fnmatch.fnmatch(item, pattern):
-                            try:
-                                result = subprocess.run([full_path, "--version"], 
-                                                      capture_output=True, text=True)
-                                version = result.stdout.strip()
-                                versions.append((version, full_path))
-                            except:
-                                continue
-                except Exception as e:
-                    print(f"Error checking path {path_pattern}: {e}")
-                    continue
-        
-        # Add the current Python version
-        current_version = f"Python {sys.version.split()[0]} (Current)"
-        versions.insert(0, (current_version, sys.executable))
-        
-        # Remove duplicates while preserving order
-        seen = set()
-        unique_versions = []
-        for version, path in versions:
+                for full_path in sorted(glob.glob(path_pattern)):
+                    if os.path.isfile(full_path) and not os.path.islink(full_path):
+                        candidates.append(full_path)
+
+        # Remove duplicates (and the running interpreter) while preserving order
+        seen = {sys.executable}
+        unique_candidates = []
+        for path in candidates:
             if path not in seen:
                 seen.add(path)
-                unique_versions.append((version, path))
-        
-        return unique_versions
+                unique_candidates.append(path)
+        return unique_candidates
+
+    def find_python_versions(self):
+        """Find available Python versions on the system."""
+        # Add the current Python version
+        current_version = f"Python {sys.version.split()[0]} (Current)"
+        versions = [(current_version, sys.executable)]
+
+        # Probed concurrently; cached interpreters are not run at all
+        for path, info in interpreters.probe_all(self.find_python_candidates()):
+            if info:
+                versions.append((f"Python {info['version']}", path))
+        interpreters.default_cache().save()
+        return versions
+
+    def start_python_probe(self, combo):
+        """Fill combo with interpreter versions from a background probe as they arrive."""
+        self.cancel_python_probe()
+        thread = QThread(self)
+        worker = ProbeWorker(self.find_python_candidates())
+        worker.moveToThread(thread)
+        thread.started.connect(worker.run)
+        worker.found.connect(self.add_python_version)
+        worker.finished.connect(thread.quit)
+        thread.finished.connect(thread.deleteLater)
+        self.version_combo = combo
+        self.probe_thread = thread
+        self.probe_worker = worker
+        thread.start()
+
+    def add_python_version(self, version, path):
+        if self.sender() is not self.probe_worker or self.version_combo is None:
+            return
+        if self.version_combo.findData(path) < 0:
+            self.version_combo.addItem(version, path)
+
+    def cancel_python_probe(self):
+        if self.probe_worker is not None:
+            self.probe_worker.cancel()
+        self.probe_worker = None
+        self.version_combo = None
 
     def create_venv(self):
         folder = QFileDialog.getExistingDirectory(self, "Select Folder for New Venv")
         if not folder:
             return
             
-        # Get available Python versions
-        versions = self.find_python_versions()
-        if not versions:
-            QMessageBox.critical(self, "Error", "No Python versions found on the system.")
-            return
-            
         # Create dialog for venv name and Python version
         dialog = QDialog(self)
         dialog.setWindowTitle("Create New Virtual Environment")
-        dialog.setStyleSheet("""
-            QDialog {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-            }
-            QLineEdit, QComboBox {
-                background-color: #2D2D2D;
-                border: 1px solid #3D3D3D;
-                border-radius: 4px;
-                padding: 5px;
-                color: #E0E0E0;
-                min-width: 200px;
-            }
-            QLabel {
-                color: #B0B0B0;
-            }
-        """)
         
         layout = QVBoxLayout()
         dialog.setLayout(layout)
@@ -513,8 +1445,9 @@ class VenvManager(QWidget):
         version_layout = QHBoxLayout()
         version_label = QLabel("Python Version:")
         version_combo = QComboBox()
-        for version, path in versions:
-            version_combo.addItem(version, path)
+        # Other interpreters are added by a background probe as they respond
+        version_combo.addItem(f"Python {sys.version.split()[0]} (Current)", sys.executable)
+        self.start_python_probe(version_combo)
         version_layout.addWidget(version_label)
         version_layout.addWidget(version_combo)
         layout.addLayout(version_layout)
@@ -535,7 +1468,9 @@ class VenvManager(QWidget):
         create_btn.clicked.connect(dialog.accept)
         cancel_btn.clicked.connect(dialog.reject)
         
-        if dialog.exec() == QDialog.DialogCode.Accepted:
+        accepted = dialog.exec() == QDialog.DialogCode.Accepted
+        self.cancel_python_probe()
+        if accepted:
             name = name_input.text().strip()
             if not name:
                 QMessageBox.warning(self, "Error", "Please enter a name for the virtual environment.")
@@ -544,20 +1479,15 @@ class VenvManager(QWidget):
             python_path = version_combo.currentData()
             venv_path = Path(folder) / name
             
-            try:
-                subprocess.run([python_path, "-m", "venv", str(venv_path)], check=True)
-                QMessageBox.information(self, "Success", f"Venv '{name}' created!")
-                self.load_venvs()
-            except subprocess.CalledProcessError as e:
-                QMessageBox.critical(self, "Error", f"Failed to create virtual environment:\n{str(e)}")
+            self.submit_job(CreateJob(venv_path, python_path))
 
     def open_terminal(self):
-        item = self.venv_list.currentItem()
-        if not item:
+        venv = self.current_venv()
+        if not venv:
             QMessageBox.warning(self, "No selection", "Please select a venv first.")
             return
         
-        path = Path(item.text())
+        path = Path(venv)
         if os.name == "nt":  # Windows
             activate_script = path / "Scripts" / "activate.bat"
             if not activate_script.exists():
@@ -571,6 +1501,7 @@ class VenvManager(QWidget):
             
             try:
                 subprocess.Popen(['cmd', '/c', str(temp_bat)], creationflags=subprocess.CREATE_NEW_CONSOLE)
+                self.venv_activated(venv)
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Could not open terminal:\n{str(e)}")
         else:  # Unix-like systems
@@ -591,6 +1522,7 @@ class VenvManager(QWidget):
                 for cmd in terminal_commands:
                     try:
                         subprocess.Popen(cmd)
+                        self.venv_activated(venv)
                         return
                     except FileNotFoundError:
                         continue
@@ -600,72 +1532,160 @@ class VenvManager(QWidget):
             except Exception as e:
                 QMessageBox.critical(self, "Error", f"Could not open terminal:\n{str(e)}")
 
+    def venv_activated(self, venv):
+        """Remember the activation for stale detection; the venv loses any stale badge."""
+        venvstale.record_activation(venv)
+        if venv in self.venv_model.usage:
+            usage = venvstale.score(venv, self.index.info(venv), venvstale.ActivationLog())
+            self.venv_model.set_usage(venv, usage)
+
     def browse_folder(self):
-        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Scan for Venvs")
+        folder = QFileDialog.getExistingDirectory(self, "Select Folder to Scan for Venvs", self.base_path)
         if folder:
+            # Remembered as a search root for later sessions and the CLI's --roots
             self.base_path = folder
+            venvroots.add_root(folder)
             self.load_venvs()
 
     def show_context_menu(self, position):
-        item = self.venv_list.itemAt(position)
-        if not item:
+        index = self.venv_list.indexAt(position)
+        if not index.isValid():
             return
+        venv = self.venv_model.path(self.venv_proxy.mapToSource(index).row())
+        venvs = self.selected_venvs()
+        if venv not in venvs:
+            venvs = [venv]
+        count = f" {len(venvs)} Venvs" if len(venvs) > 1 else ""
 
         menu = QMenu()
-        delete_action = menu.addAction("Delete")
-        delete_action.triggered.connect(lambda: self.delete_venv(item))
+        delete_action = menu.addAction(f"Delete{count}")
+        delete_action.triggered.connect(lambda: self.delete_venvs(venvs))
+        recreate_action = menu.addAction(f"Recreate{count}")
+        recreate_action.triggered.connect(lambda: self.recreate_venvs(venvs))
+        upgrade_action = menu.addAction(f"Upgrade pip{' in' + count if count else ''}")
+        upgrade_action.triggered.connect(lambda: self.upgrade_pip(venvs))
+        export_action = menu.addAction("Export Packages...")
+        export_action.triggered.connect(lambda: self.export_packages(venvs))
         
         menu.exec(self.venv_list.mapToGlobal(position))
 
-    def delete_venv(self, item):
-        path = Path(item.text())
-        
-        # Create confirmation dialog
+    def show_diagnostics(self):
+        DiagnosticsDialog(self).exec()
+
+    def confirm(self, title, text, button):
+        """Ask once before a destructive action; returns True if confirmed."""
         confirm_dialog = QDialog(self)
-        confirm_dialog.setWindowTitle("Confirm Deletion")
-        confirm_dialog.setStyleSheet("""
-            QDialog {
-                background-color: #1E1E1E;
-                color: #E0E0E0;
-            }
-            QLabel {
-                color: #B0B0B0;
-                font-size: 13px;
-            }
-        """)
+        confirm_dialog.setWindowTitle(title)
         
         layout = QVBoxLayout()
         confirm_dialog.setLayout(layout)
         
-        message = QLabel(f"Are you sure you want to delete the virtual environment at:\n{path}?")
+        message = QLabel(text)
         message.setWordWrap(True)
         layout.addWidget(message)
         
         button_layout = QHBoxLayout()
-        delete_btn = ModernButton("Delete")
+        ok_btn = ModernButton(button)
         cancel_btn = ModernButton("Cancel")
-        button_layout.addWidget(delete_btn)
+        button_layout.addWidget(ok_btn)
         button_layout.addWidget(cancel_btn)
         layout.addLayout(button_layout)
         
         confirm_dialog.setFixedSize(400, 150)
         confirm_dialog.setWindowModality(Qt.WindowModality.ApplicationModal)
         
-        delete_btn.clicked.connect(confirm_dialog.accept)
+        ok_btn.clicked.connect(confirm_dialog.accept)
         cancel_btn.clicked.connect(confirm_dialog.reject)
         
-        if confirm_dialog.exec() == QDialog.DialogCode.Accepted:
+        return confirm_dialog.exec() == QDialog.DialogCode.Accepted
+
+    def describe_selection(self, venvs):
+        if len(venvs) == 1:
+            return f"the virtual environment at:\n{venvs[0]}"
+        return f"these {len(venvs)} virtual environments:\n{venvs[0]}\nand {len(venvs) - 1} more"
+
+    def delete_venvs(self, venvs):
+        if not self.confirm("Confirm Deletion", f"Are you sure you want to delete {self.describe_selection(venvs)}?",
+                            "Delete"):
+            return
+        import venvtrash
+        entries = []
+        removed = []
+        for venv in venvs:
             try:
-                import shutil
-                shutil.rmtree(path)
-                self.load_venvs()  # Refresh the list
-                QMessageBox.information(self, "Success", "Virtual environment deleted successfully.")
-            except Exception as e:
-                QMessageBox.critical(self, "Error", f"Failed to delete virtual environment:\n{str(e)}")
+                # One rename: the venv is gone from its folder immediately
+                entries.append(venvtrash.trash(venv))
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to delete virtual environment {venv}:\n{str(e)}")
+                break
+            removed.append(venv)
+            self.info_cache.discard(venv)
+        self.venv_model.remove(removed)
+        venvstale.ActivationLog().forget(entry['original'] for entry in entries)
+        if entries:
+            self.submit_job(DeleteJob(entries))
+
+    def recreate_venvs(self, venvs):
+        if not self.confirm("Confirm Recreation",
+                            f"Rebuild {self.describe_selection(venvs)}\nwith the same interpreter and packages?",
+                            "Recreate"):
+            return
+        import venvbatch
+        import venvtrash
+
+        def recreate(venv, stop):
+            # The old venv is only purged once the new one is complete
+            venvtrash.purge(venvbatch.recreate(venv, stop=stop))
+            return venv
+        title = f"Recreate {venvs[0]}" if len(venvs) == 1 else f"Recreate {len(venvs)} venvs"
+        self.submit_job(BatchJob(title, "recreated", recreate, venvs))
+
+    def upgrade_pip(self, venvs):
+        import venvbatch
+        title = f"Upgrade pip in {venvs[0]}" if len(venvs) == 1 else f"Upgrade pip in {len(venvs)} venvs"
+        self.submit_job(BatchJob(title, "upgraded", venvbatch.upgrade_pip, venvs))
+
+    def export_packages(self, venvs):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Packages", "packages.csv", "CSV (*.csv)")
+        if path:
+            self.submit_job(PackagesJob(venvs, path))
+
+class FirstPaintProfiler(QObject):
+    """Prints the --profile-startup report when the window is first painted, then quits."""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self.window = window
+
+    def eventFilter(self, obj, event):
+        if event.type() == QEvent.Type.Paint:
+            obj.removeEventFilter(self)
+            mark_startup("first paint")
+            print_startup_profile()
+            QTimer.singleShot(0, self.quit)
+        return False
+
+    def quit(self):
+        self.window.close()
+        QApplication.quit()
+
+def print_startup_profile(out=None):
+    out = out or sys.stderr
+    start = previous = STARTUP_MARKS[0][1]
+    print(f"{'phase':<24} {'step ms':>9} {'total ms':>9}", file=out)
+    for name, stamp in STARTUP_MARKS[1:]:
+        print(f"{name:<24} {(stamp - previous) * 1000:9.1f} {(stamp - start) * 1000:9.1f}", file=out)
+        previous = stamp
 
 
 if __name__ == "__main__":
     app = QApplication(sys.argv)
+    app.setStyleSheet(STYLESHEET)
+    # Cheap enough to leave on, so the Diagnostics dialog can explain a slow scan after the fact
+    venvtrace.enable()
+    mark_startup("QApplication")
     win = VenvManager()
+    if "--profile-startup" in sys.argv:
+        win.installEventFilter(FirstPaintProfiler(win))
     win.show()
     sys.exit(app.exec())